@@ -0,0 +1,52 @@
+"""
+Fixed depth search over the test positions. Total nodes are a signature of the search behavior,
+a change which is meant to only make the engine faster must not change them.
+"""
+import random
+import sys
+import time
+
+from chess import Board
+from chess.engine import Limit
+
+from engine.ab_depth_prune import ABDeppeningEngine
+from engine.alpha_beta import AlphaBetaEngine
+from engine.basilisk import BasiliskEngine
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator, V1Evaluator, BasicMaterialEvaluator
+from tests.test_fens import FEN_RESPONSES
+
+BENCH_FENS = [fen for fen, _ in FEN_RESPONSES]
+DEFAULT_DEPTH = 4
+
+ENGINE_FACTORIES = {
+    "BasiliskEngine": lambda: BasiliskEngine(V0Evaluator(noise=False)),
+    "BasiliskEngineV1": lambda: BasiliskEngine(V1Evaluator(noise=False)),
+    "ABDeppeningEngine": lambda: ABDeppeningEngine(V0Evaluator(noise=False)),
+    "AlphaBetaEngine": lambda: AlphaBetaEngine(BasicMaterialEvaluator()),
+}
+
+
+def bench(engine_factory, depth: int) -> tuple[int, float]:
+    """(total nodes, elapsed seconds) of a fixed depth search of every bench position with a new engine"""
+    nodes = 0
+    elapsed = 0.
+    for fen in BENCH_FENS:
+        random.seed(0)
+        engine = engine_factory()
+        engine.max_depth = depth
+        start = time.perf_counter()
+        engine.play(ExtendedBoard(fen), Limit(depth=depth))
+        elapsed += time.perf_counter() - start
+        nodes += engine.visited_nodes
+        engine.quit()
+    return nodes, elapsed
+
+
+if __name__ == '__main__':
+    # Usage: python bench.py [depth] [engine name...]
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_DEPTH
+    names = sys.argv[2:] or list(ENGINE_FACTORIES)
+    for name in names:
+        nodes, elapsed = bench(ENGINE_FACTORIES[name], depth)
+        print(f"{name}: depth {depth}, nodes {nodes}, time {elapsed:.2f} s, nps {int(nodes / elapsed)}")
@@ -1,9 +1,8 @@
-import time
-
 import math
 
 from engine.base import BaseEngine, ExpectedTimeoutException
 from engine.board import ExtendedBoard
+from engine.time_manager import TimeManager
 from engine.evaluators import V0Evaluator, MATE_EVALUATION
 from chess import Board, PAWN,KNIGHT,BISHOP,ROOK,QUEEN,KING,SQUARES_180,BB_SQUARES,WHITE,BLACK, Outcome, Termination
 from chess.engine import PlayResult, Limit
@@ -11,8 +10,7 @@ from chess.engine import PlayResult, Limit
 
 class ABDeppeningEngine(BaseEngine):
     def play(self, board: ExtendedBoard, limit: Limit):
-        self.start_time = time.time()
-        self.time = limit.time
+        self.time_manager = TimeManager(board, limit)
         self.board = ExtendedBoard(board.fen())
         best_line, best_result = self.find_move(self.max_depth, master_alpha=-math.inf, master_beta=math.inf, is_top_level=True)
         return PlayResult(best_line[-1], None)
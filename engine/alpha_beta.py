@@ -12,6 +12,7 @@ class AlphaBetaEngine(BaseEngine):
         return PlayResult(best_move, None)
 
     def find_move(self, board: Board, depth: int, is_white: bool, alpha: float, beta: float):
+        self.visited_nodes += 1
         self.check_timeout()
         if depth == 0:
             return None, self.evaluator.evaluate(board)
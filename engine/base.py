@@ -1,11 +1,11 @@
 import abc
 import random
-import time
 
 from chess import Board
 from chess.engine import PlayResult, Limit
 
 from engine.evaluators import MATE_EVALUATION, BaseEvaluator
+from engine.time_manager import TimeManager, TIMEOUT_CHECK_INTERVAL
 
 class ExpectedTimeoutException(Exception):
     pass
@@ -14,19 +14,20 @@ class BaseEngine(abc.ABC):
     def __init__(self, evaluator: BaseEvaluator):
         self.evaluator = evaluator
         self.max_depth = 12
-        self.time = None
-        self.start_time = None
+        self.time_manager = None
+        self.timeout_checks = 0
         self.visited_nodes = 0
         self.achieved_depths = []
         self.board = None
+        self.stop_requested = False  # Set from another thread to end the search (eg. UCI stop)
+        self.info_handler = None  # Called with InfoDict after each completed iteration
 
     @abc.abstractmethod
     def _play(self, board: Board, depth: int, *args, **kwargs):
         pass
 
     def play(self, board: Board, limit: Limit):
-        self.start_time = time.time()
-        self.time = limit.time
+        self.time_manager = TimeManager(board, limit)
         play_result = None
         for depth in range(1, self.max_depth + 1):
             try:
@@ -37,8 +38,13 @@ class BaseEngine(abc.ABC):
         return play_result
 
     def check_timeout(self):
-        elapsed = time.time() - self.start_time
-        if elapsed > self.time - 0.01: # Leave some time for cleanup
+        if self.stop_requested:
+            raise ExpectedTimeoutException()
+        # Clock is polled only every few nodes
+        self.timeout_checks += 1
+        if self.timeout_checks & (TIMEOUT_CHECK_INTERVAL - 1):
+            return
+        if self.time_manager.is_time_up():
             raise ExpectedTimeoutException()
 
     def quit(self):
@@ -1,12 +1,18 @@
-import time
+import threading
 
 import math
 
 from engine.base import BaseEngine, ExpectedTimeoutException
 from engine.board import ExtendedBoard
-from engine.evaluators import V0Evaluator, MATE_EVALUATION
-from chess import Board, PAWN,KNIGHT,BISHOP,ROOK,QUEEN,KING,SQUARES_180,BB_SQUARES,WHITE,BLACK, Outcome, Termination, Move
-from chess.engine import PlayResult, Limit
+from engine.book import OpeningBook
+from engine.tablebase import Tablebase
+from engine.evaluators import V0Evaluator, MATE_EVALUATION, BaseEvaluator
+from engine.stats import StatsCollector, SearchStats
+from engine.time_manager import TimeManager
+from engine.transposition import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from chess import Board, PAWN,KNIGHT,BISHOP,ROOK,QUEEN,KING,SQUARES_180,BB_SQUARES,WHITE,BLACK, Outcome, Termination, Move, BB_RANK_2, BB_RANK_7
+from chess.engine import PlayResult, Limit, PovScore, Cp, Mate
+from chess.polyglot import zobrist_hash
 
 PIECE_ORDER = {
     BISHOP: 4,
@@ -24,101 +30,508 @@ PIECE_ORDER_ENDGAME = {
     BISHOP: 2,
     KNIGHT: 1,
 }
+# Least valuable attacker first when ordering captures
+ATTACKER_ORDER = {
+    PAWN: 1,
+    KNIGHT: 2,
+    BISHOP: 2,
+    ROOK: 3,
+    QUEEN: 4,
+    KING: 5,
+}
+DELTA_MARGIN = 2  # Largest positional swing expected from a single capture
+PROMOTION_FROM_RANKS = (BB_RANK_2, BB_RANK_7)  # Indexed by color
+MAX_PLY = 64
+TABLEBASE_WIN_EVALUATION = MATE_EVALUATION / 2
+NULL_WINDOW = 0.001  # Scores are continuous, a window this narrow only answers better or not
+ASPIRATION_WINDOW = 0.5  # Root window around the score of the previous iteration
+ASPIRATION_GROWTH = 4
+MAX_ASPIRATION_WINDOW = 4  # Wider windows are replaced by the full one
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_VERIFICATION_DEPTH = 5  # From this depth a null move cutoff is confirmed by a reduced normal search
+LATE_MOVE_INDEX = 3  # Quiet moves ordered after this many moves are reduced
+LATE_MOVE_MIN_DEPTH = 3
+
+def get_score(evaluation: float, depth: int) -> PovScore:
+    """Evaluation (from white perspective) of an iteration with given depth as a python-chess score"""
+    if abs(evaluation) >= MATE_EVALUATION:
+        # Mate evaluation is increased by the depth remaining at the mated position
+        plies = depth - int(abs(evaluation) - MATE_EVALUATION)
+        moves = (plies + 1) // 2
+        return PovScore(Mate(moves if evaluation > 0 else -moves), WHITE)
+    return PovScore(Cp(round(evaluation * 100)), WHITE)
+
+
+def score_to_table(score: float, depth: int) -> float:
+    """Mate scores count the remaining depth at the mated position, in the table they count plies from the stored node"""
+    if score >= MATE_EVALUATION:
+        return score - depth
+    if score <= -MATE_EVALUATION:
+        return score + depth
+    return score
+
+
+def score_from_table(score: float, depth: int) -> float:
+    # Inverse of score_to_table at a node with the given remaining depth
+    if score > MATE_EVALUATION - MAX_PLY:
+        return score + depth
+    if score < -MATE_EVALUATION + MAX_PLY:
+        return score - depth
+    return score
+
 
 class BasiliskEngine(BaseEngine):
+    def __init__(self, evaluator: BaseEvaluator, book: OpeningBook | None = None, tablebase: Tablebase | None = None, ponder: bool = False, stats_collector: StatsCollector | None = None):
+        super().__init__(evaluator)
+        self.book = book
+        self.tablebase = tablebase
+        # Search the position after the expected reply while the opponent thinks
+        self.ponder = ponder
+        self.ponder_thread = None
+        self.ponder_hash = None
+        self.ponder_result = None
+        # Kept between moves, positions from the previous search are often reached again
+        self.transposition_table = TranspositionTable()
+        # Quiet moves which caused a cutoff, two per ply and a from/to square table weighted by depth
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [0] * 64 * 64
+        # Triangular principal variation table, row of a ply holds the best line from that ply
+        self.pv_table = [[None] * (MAX_PLY - ply) for ply in range(MAX_PLY)]
+        self.pv_length = [0] * MAX_PLY
+        self.min_depth = 2  # First iteration of iterative deepening
+        # Deepest fully searched iteration of the last play call, line starts with the root move
+        self.completed_depth = 0
+        self.completed_line = None
+        self.completed_evaluation = None
+        self.start_nodes = 0
+        # Stats of the current search, None when not collected
+        self.stats_collector = stats_collector
+        self.stats = None
+
     def play(self, board: ExtendedBoard, limit: Limit):
-        self.start_time = time.time()
-        self.time = limit.time
+        play_result = None
+        if self.ponder_thread is not None:
+            if zobrist_hash(board) == self.ponder_hash:
+                # Ponder hit, the running search continues from the depth it reached with normal time limit
+                self.time_manager = TimeManager(board, limit)
+                self.ponder_thread.join()
+                play_result = self.ponder_result
+            else:
+                # Ponder miss, only the transposition table is reused
+                self.stop_pondering()
+
+        self.ponder_thread = None
+        if play_result is None:
+            play_result = self.search(board, limit)
+        if self.ponder and play_result.ponder is not None:
+            self.start_pondering(board, play_result)
+        return play_result
+
+    def start_pondering(self, board: Board, play_result: PlayResult):
+        # Copy of an ExtendedBoard doesn't carry its incremental state, the search builds its own board anyway
+        ponder_board = Board(board.fen())
+        ponder_board.push(play_result.move)
+        ponder_board.push(play_result.ponder)
+        self.ponder_hash = zobrist_hash(ponder_board)
+        self.ponder_result = None
+        # No time limit until ponder hit. Set before the thread starts, so that it can't replace the one set by the hit
+        self.time_manager = TimeManager(ponder_board, Limit())
+        self.ponder_thread = threading.Thread(target=self.ponder_search, args=(ponder_board,), daemon=True)
+        self.ponder_thread.start()
+
+    def ponder_search(self, board: Board):
+        self.ponder_result = self.search_position(board, Limit())
+
+    def stop_pondering(self):
+        if self.ponder_thread is not None:
+            self.stop_requested = True
+            self.ponder_thread.join()
+            self.stop_requested = False
+            self.ponder_thread = None
+
+    def quit(self):
+        self.stop_pondering()
+
+    def search(self, board: Board, limit: Limit) -> PlayResult:
+        self.time_manager = TimeManager(board, limit)
+        return self.search_position(board, limit)
+
+    def search_position(self, board: Board, limit: Limit) -> PlayResult:
+        """Search with the time manager already set by the caller"""
         self.board = ExtendedBoard(board.fen())
-        best_line, best_result = self.find_move(self.max_depth, master_alpha=-math.inf, master_beta=math.inf, is_top_level=True)
-        return PlayResult(best_line[-1], None)
+        book_move = self.get_book_move()
+        if book_move is not None:
+            return PlayResult(book_move, None)
+        if self.tablebase is not None:
+            tablebase_move = self.tablebase.probe_root(self.board)
+            if tablebase_move is not None:
+                return PlayResult(tablebase_move, None)
+        self.killers = [[None, None] for _ in range(MAX_PLY)]
+        self.history = [value // 2 for value in self.history]  # Age cutoffs from previous moves
+        self.completed_depth = 0
+        self.completed_line = None
+        self.completed_evaluation = None
+        self.start_nodes = self.visited_nodes
+        if self.stats_collector is not None:
+            self.stats = SearchStats(self.board.fen())
+        max_depth = limit.depth or self.max_depth
+        best_result = self.find_move(max_depth, master_alpha=-math.inf, master_beta=math.inf, is_top_level=True)
+        if self.stats is not None:
+            self.stats_collector.write(self.stats)
+        principal_variation = self.pv_table[0][:self.pv_length[0]]
+        if math.isinf(best_result):
+            # Stopped before the first move of the last iteration was searched
+            principal_variation, best_result = self.completed_line, self.completed_evaluation
+        if not principal_variation:
+            # Stopped before any move was searched
+            return PlayResult(next(iter(self.board.legal_moves)), None)
+        ponder = principal_variation[1] if len(principal_variation) > 1 else None
+        return PlayResult(principal_variation[0], ponder, self.get_info(self.completed_depth, principal_variation, best_result))
 
 
     def _play(self, *args, **kwargs):
         pass
 
+    def get_info(self, depth: int, line: list, evaluation: float) -> dict:
+        elapsed = self.time_manager.elapsed()
+        nodes = self.visited_nodes - self.start_nodes
+        return {
+            "depth": depth,
+            "score": get_score(evaluation, depth),
+            "pv": line,
+            "nodes": nodes,
+            "time": elapsed,
+            "nps": int(nodes / elapsed) if elapsed > 0 else 0,
+        }
+
+    def get_book_move(self) -> Move | None:
+        if self.book is None:
+            return None
+        return self.book.probe(self.board)
+
 
 
-    def find_move(self, max_depth: int, master_alpha: float, master_beta: float, is_top_level=False):
+    def find_move(self, max_depth: int, master_alpha: float, master_beta: float, is_top_level=False, can_null_move=True):
         self.visited_nodes += 1
         is_white = self.board.turn
         anti_optimum = -math.inf if is_white else math.inf
         self.check_timeout()
+        ply = len(self.board.move_stack)
+        self.pv_length[ply] = 0
 
         if max_depth == 0:
-            return [], self.evaluator.evaluate(self.board)
+            return self.quiescence(master_alpha, master_beta)
 
         if not is_top_level:
-            game_over_result = self.board.check_game_over()
-            if game_over_result is not None:
-                return [], game_over_result * (MATE_EVALUATION + max_depth)
+            if self.board.check_draw():
+                return 0
+
+            if self.tablebase is not None:
+                wdl = self.tablebase.probe_wdl(self.board)
+                if wdl is not None:
+                    return self.get_tablebase_evaluation(wdl, max_depth)
+
+        hash_move = None
+        entry = self.transposition_table.probe(self.board.zobrist_hash)
+        if entry is not None:
+            _, entry_depth, bound, score, hash_move = entry
+            score = score_from_table(score, max_depth)
+            if not is_top_level and entry_depth >= max_depth:
+                if bound == EXACT or (bound == LOWER_BOUND and score >= master_beta) or (bound == UPPER_BOUND and score <= master_alpha):
+                    return score
+
+        in_check = self.board.is_check()
+        if can_null_move and not is_top_level and not in_check and max_depth >= NULL_MOVE_MIN_DEPTH:
+            null_move_result = self.null_move_search(max_depth, master_alpha, master_beta)
+            if null_move_result is not None:
+                return null_move_result
 
-        best_line = None
+        best_move = None
         best_result = anti_optimum
 
-        move_evaluation_map = [[anti_optimum, move] for move in self.get_legal_moves()]
-        min_depth = 2 if is_top_level else max_depth
+        moves = self.get_legal_moves(hash_move, ply)
+        if is_top_level:
+            # Root moves are sorted again by evaluations from the previous iteration
+            move_evaluation_map = [[anti_optimum, move] for move in moves]
+        else:
+            # Single iteration, moves are generated lazily because the first ones often cause a cutoff
+            move_evaluation_map = ([anti_optimum, move] for move in moves)
+        min_depth = self.min_depth if is_top_level else max_depth
         for depth in range(min_depth, max_depth + 1):
-            alpha = master_alpha
-            beta = master_beta
-            best_result = anti_optimum
-            move_evaluation_map.sort(key=lambda it: it[0], reverse=is_white)
-            try:
-                for i, move_item in enumerate(move_evaluation_map):
-                    move = move_item[1]
-                    # if depth >= 4:
-                    #     # Null move pruning
-                    #     with self.board.apply(move):
-                    #         with self.board.apply(Move.null()):
-                    #             _, evaluation = self.find_move(max_depth=depth - 2, master_alpha=alpha, master_beta=beta)
-                    #             if (is_white and evaluation < best_result) or (not is_white and evaluation > best_result):
-                    #                 move_evaluation_map[i][0] = anti_optimum
-                    #                 continue
-                    with self.board.apply(move):
-                        line, evaluation = self.find_move(max_depth=depth - 1, master_alpha=alpha, master_beta=beta)
-                        move_item[0] = evaluation
-
-                        if is_white:
-                            if evaluation > best_result:
-                                best_result = evaluation
-                                line.append(move)
-                                best_line = line
-                            alpha = max(alpha, evaluation)
-                        else:
-                            if evaluation < best_result:
-                                best_result = evaluation
-                                line.append(move)
-                                best_line = line
-                            beta = min(beta, evaluation)
-
-                    if beta <= alpha:
-                        if depth == max_depth:
-                            return best_line, best_result
-                        else:
-                            for j in range(i+1, len(move_evaluation_map)):
-                                move_evaluation_map[j][0] = anti_optimum
-            except ExpectedTimeoutException as ex:
+            if is_top_level and depth > min_depth and not self.time_manager.can_start_iteration():
+                # Next iteration would most likely not finish before the hard limit
+                self.achieved_depths.append(depth)
+                return best_result
+            window = ASPIRATION_WINDOW
+            if is_top_level and depth > min_depth and abs(self.completed_evaluation) < TABLEBASE_WIN_EVALUATION:
+                # Aspiration window, the score rarely changes much between iterations
+                window_alpha = max(master_alpha, self.completed_evaluation - window)
+                window_beta = min(master_beta, self.completed_evaluation + window)
+            else:
+                window_alpha = master_alpha
+                window_beta = master_beta
+            if is_top_level:
+                iteration_nodes = self.visited_nodes
+                iteration_time = self.time_manager.elapsed()
+            while True:
+                alpha = window_alpha
+                beta = window_beta
+                best_result = anti_optimum
                 if is_top_level:
-                    self.achieved_depths.append(depth)
-                    return best_line, best_result
+                    move_evaluation_map.sort(key=lambda it: it[0], reverse=is_white)
+                try:
+                    for i, move_item in enumerate(move_evaluation_map):
+                        move = move_item[1]
+                        # Late quiet moves are rarely best, they are searched shallower first
+                        is_late_quiet = (
+                            i >= LATE_MOVE_INDEX and depth >= LATE_MOVE_MIN_DEPTH and not is_top_level and not in_check
+                            and not move.promotion and not self.board.is_capture(move)
+                        )
+                        with self.board.apply(move):
+                            if i == 0:
+                                evaluation = self.find_move(max_depth=depth - 1, master_alpha=alpha, master_beta=beta)
+                            else:
+                                # Null window only proves the move is not better than the best one, search again if it is
+                                if is_late_quiet and not self.board.is_check():
+                                    evaluation = self.null_window_search(depth - 2, alpha, beta, is_white)
+                                    # Reduced search beating the bound of the mover is verified at full depth,
+                                    # in a null window node it would otherwise cause a cutoff unverified
+                                    if evaluation > alpha if is_white else evaluation < beta:
+                                        evaluation = self.null_window_search(depth - 1, alpha, beta, is_white)
+                                else:
+                                    evaluation = self.null_window_search(depth - 1, alpha, beta, is_white)
+                                if alpha < evaluation < beta:
+                                    evaluation = self.find_move(max_depth=depth - 1, master_alpha=alpha, master_beta=beta)
+                            move_item[0] = evaluation
+
+                            if is_white:
+                                if evaluation > best_result:
+                                    best_result = evaluation
+                                    best_move = move
+                                    self.update_pv(ply, move)
+                                alpha = max(alpha, evaluation)
+                            else:
+                                if evaluation < best_result:
+                                    best_result = evaluation
+                                    best_move = move
+                                    self.update_pv(ply, move)
+                                beta = min(beta, evaluation)
+
+                        if beta <= alpha:
+                            if self.stats is not None:
+                                self.stats.beta_cutoffs += 1
+                                self.stats.first_move_cutoffs += i == 0
+                            if not self.board.is_capture(move) and not move.promotion:
+                                self.store_cutoff(move, depth, ply)
+                            break
+                except ExpectedTimeoutException as ex:
+                    if is_top_level:
+                        self.achieved_depths.append(depth)
+                        if self.stats is not None:
+                            self.stats.abort_iteration(depth, self.visited_nodes - iteration_nodes, self.time_manager.elapsed() - iteration_time)
+                        return best_result
+                    else:
+                        raise ex
+                if not is_top_level:
+                    break
+                # Outside of the aspiration window the score is only a bound, search again with a wider window
+                window *= ASPIRATION_GROWTH
+                if best_result <= window_alpha and window_alpha > master_alpha:
+                    window_alpha = master_alpha if window > MAX_ASPIRATION_WINDOW else max(master_alpha, self.completed_evaluation - window)
+                elif best_result >= window_beta and window_beta < master_beta:
+                    window_beta = master_beta if window > MAX_ASPIRATION_WINDOW else min(master_beta, self.completed_evaluation + window)
                 else:
-                    raise ex
-        return best_line, best_result
+                    break
+            if best_move is None and not is_top_level:
+                # No legal moves
+                if self.board.is_check():
+                    return (-1 if is_white else 1) * (MATE_EVALUATION + max_depth)
+                return 0
+            self.store_result(depth, best_result, best_move, master_alpha, master_beta)
+            if is_top_level:
+                self.completed_depth = depth
+                self.completed_line = self.pv_table[0][:self.pv_length[0]]
+                self.completed_evaluation = best_result
+                if self.stats is not None:
+                    self.stats.add_iteration(depth, self.visited_nodes - iteration_nodes, self.time_manager.elapsed() - iteration_time)
+                if self.info_handler is not None:
+                    self.info_handler(self.get_info(depth, self.completed_line, best_result))
+        return best_result
+
+    def null_window_search(self, depth: int, alpha: float, beta: float, is_white: bool) -> float:
+        # Window next to the bound of the side which moved at the parent node
+        if is_white:
+            return self.find_move(max_depth=depth, master_alpha=alpha, master_beta=alpha + NULL_WINDOW)
+        return self.find_move(max_depth=depth, master_alpha=beta - NULL_WINDOW, master_beta=beta)
+
+    def null_move_search(self, depth: int, alpha: float, beta: float) -> float | None:
+        """Evaluation to return if passing the move still fails high, so any real move would too"""
+        is_white = self.board.turn
+        # Two passes in a row would only search the same position shallower
+        if self.board.move_stack and not self.board.move_stack[-1]:
+            return None
+        # Zugzwang is common when only pawns are left, passing would be the best move there
+        if not self.board.occupied_co[is_white] & ~(self.board.pawns | self.board.kings):
+            return None
+        # Only nodes where the side to move has a bound to beat
+        if (beta if is_white else alpha) in (math.inf, -math.inf):
+            return None
+        stand_pat = self.evaluator.evaluate(self.board)
+        if self.stats is not None:
+            self.stats.evaluations += 1
+        if stand_pat < beta if is_white else stand_pat > alpha:
+            return None
 
+        with self.board.apply(Move.null()):
+            # Null window at the bound of the passing side
+            evaluation = self.null_window_search(depth - 1 - NULL_MOVE_REDUCTION, beta - NULL_WINDOW, alpha + NULL_WINDOW, is_white)
+        if evaluation < beta if is_white else evaluation > alpha:
+            return None
+        if depth >= NULL_MOVE_VERIFICATION_DEPTH:
+            # Verification without another null move, catches zugzwang in positions with pieces
+            evaluation = self.find_move(depth - NULL_MOVE_REDUCTION, alpha, beta, can_null_move=False)
+            if evaluation < beta if is_white else evaluation > alpha:
+                return None
+        # Mate found after passing is not a real mate
+        if abs(evaluation) >= TABLEBASE_WIN_EVALUATION:
+            return beta if is_white else alpha
+        return evaluation
 
-    def get_legal_moves(self) -> list:
-        if self.board.fullmove_number > 50:  # TODO Better endgame rule
+    def update_pv(self, ply: int, move: Move):
+        # New best move followed by the line of the child node
+        row = self.pv_table[ply]
+        child_length = self.pv_length[ply + 1]
+        row[0] = move
+        row[1:child_length + 1] = self.pv_table[ply + 1][:child_length]
+        self.pv_length[ply] = child_length + 1
+
+    def get_tablebase_evaluation(self, wdl: int, depth: int) -> float:
+        # Wins and losses prevented by the fifty move rule (cursed and blessed) count as draws
+        if -2 < wdl < 2:
+            return 0.
+        sign = 1 if (wdl > 0) == self.board.turn else -1
+        # Prefer reaching won tablebase positions sooner
+        return sign * (TABLEBASE_WIN_EVALUATION + depth)
+
+    def store_cutoff(self, move: Move, depth: int, ply: int):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[move.from_square * 64 + move.to_square] += depth * depth
+
+    def quiescence(self, master_alpha: float, master_beta: float) -> float:
+        """Search only captures and promotions, so leaves are not evaluated in the middle of an exchange"""
+        self.visited_nodes += 1
+        is_white = self.board.turn
+        self.check_timeout()
+
+        # Stand pat, side to move is not forced to continue the exchange
+        best_result = self.evaluator.evaluate(self.board)
+        if self.stats is not None:
+            self.stats.evaluations += 1
+        alpha = master_alpha
+        beta = master_beta
+        if is_white:
+            if best_result >= beta:
+                return best_result
+            alpha = max(alpha, best_result)
+        else:
+            if best_result <= alpha:
+                return best_result
+            beta = min(beta, best_result)
+        stand_pat = best_result
+
+        for gain, move in self.get_tactical_moves():
+            # Delta pruning, the capture can't bring the evaluation back into the window
+            if is_white:
+                if stand_pat + gain + DELTA_MARGIN < alpha:
+                    continue
+            elif stand_pat - gain - DELTA_MARGIN > beta:
+                continue
+
+            with self.board.apply(move):
+                evaluation = self.quiescence(alpha, beta)
+
+            if is_white:
+                if evaluation > best_result:
+                    best_result = evaluation
+                alpha = max(alpha, evaluation)
+            else:
+                if evaluation < best_result:
+                    best_result = evaluation
+                beta = min(beta, evaluation)
+
+            if beta <= alpha:
+                break
+        return best_result
+
+    def store_result(self, depth: int, evaluation: float, best_move: Move | None, alpha: float, beta: float):
+        if evaluation <= alpha:
+            bound = UPPER_BOUND
+        elif evaluation >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(self.board.zobrist_hash, depth, bound, score_to_table(evaluation, depth), best_move)
+
+
+    def get_legal_moves(self, hash_move: Move | None = None, ply: int = 0):
+        """Staged generator: hash move, captures and promotions, killers and then quiet moves.
+        Each stage is generated only when the previous ones didn't cause a cutoff."""
+        board = self.board
+        if hash_move is not None and board.is_legal(hash_move):
+            yield hash_move
+        else:
+            hash_move = None
+
+        for _, move in self.get_tactical_moves(underpromotions=True):
+            if move != hash_move:
+                yield move
+
+        killers = [
+            killer for killer in self.killers[ply]
+            if killer is not None and killer != hash_move and not killer.promotion and killer.to_square not in board.pieces_map and board.is_legal(killer)
+        ]
+        yield from killers
+
+        if board.fullmove_number > 50:  # TODO Better endgame rule
             order_dict = PIECE_ORDER_ENDGAME
         else:
             order_dict = PIECE_ORDER
-
+        history = self.history
         evaluated_moves = []
-        for i, move in enumerate(self.board.legal_moves):
-            is_castling = self.board.is_castling(move)
-            capture_value = V0Evaluator.VALUE_DICT[self.board.pieces_map.get(move.to_square, 0)]
-            piece_order_value = order_dict[self.board.pieces_map[move.from_square]]
-            evaluated_moves.append((is_castling, capture_value, piece_order_value, -i, move))
-
+        # Castling moves target the own rook square in python-chess, so only opponent pieces are masked out
+        for i, move in enumerate(board.generate_legal_moves(to_mask=~board.occupied_co[not board.turn])):
+            if move.promotion or move == hash_move or move in killers or board.is_en_passant(move):
+                continue  # Already generated in previous stages
+            is_castling = board.is_castling(move)
+            history_value = history[move.from_square * 64 + move.to_square]
+            piece_order_value = order_dict[board.pieces_map[move.from_square]]
+            evaluated_moves.append((is_castling, history_value, piece_order_value, -i, move))
 
         evaluated_moves.sort(reverse=True)
         yield from (e[-1] for e in evaluated_moves)
+
+    def get_tactical_moves(self, underpromotions: bool = False) -> list:
+        """Captures (ordered by MVV-LVA) and promotions, with material gain of each move"""
+        board = self.board
+        pieces_map = board.pieces_map
+        value_dict = V0Evaluator.VALUE_DICT
+        promotion_from = board.pawns & board.occupied_co[board.turn] & PROMOTION_FROM_RANKS[board.turn]
+
+        evaluated_moves = []
+        for move in board.generate_legal_captures():
+            if move.promotion and move.promotion != QUEEN and not underpromotions:
+                continue
+            gain = value_dict[pieces_map.get(move.to_square, PAWN)]  # Empty target square is en passant
+            if move.promotion:
+                gain += value_dict[move.promotion] - value_dict[PAWN]
+            evaluated_moves.append((gain, -ATTACKER_ORDER[pieces_map[move.from_square]], move))
+        for move in board.generate_legal_moves(promotion_from, ~board.occupied):
+            if move.promotion == QUEEN or underpromotions:
+                evaluated_moves.append((value_dict[move.promotion] - value_dict[PAWN], 0, move))
+
+        evaluated_moves.sort(key=lambda it: it[:2], reverse=True)
+        return [(e[0], e[-1]) for e in evaluated_moves]
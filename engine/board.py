@@ -1,6 +1,9 @@
 from contextlib import contextmanager
 
-from chess import Board, Move, scan_reversed, BB_SQUARES, PAWN, square_file, ROOK
+from chess import Board, Move, scan_reversed, BB_SQUARES, PAWN, square_file, ROOK, KING, WHITE, BLACK, BB_A1, BB_H1, BB_A8, BB_H8, PIECE_TYPES, shift_down, shift_up, shift_left, shift_right
+from chess.polyglot import POLYGLOT_RANDOM_ARRAY, zobrist_hash
+
+from engine.piece_square_tables import MIDDLEGAME_TABLES, ENDGAME_TABLES
 
 CASTLING_ROOK_MOVES = {
     (4, 6): (7, 5),
@@ -9,6 +12,33 @@ CASTLING_ROOK_MOVES = {
     (60, 58): (56,59),
 }
 
+# Polyglot compatible Zobrist keys, indexed by [color][piece_type][square]
+PIECE_KEYS = tuple(
+    tuple(
+        tuple(POLYGLOT_RANDOM_ARRAY[64 * ((piece_type - 1) * 2 + color) + square] for square in range(64))
+        if piece_type else ()
+        for piece_type in (0, *PIECE_TYPES)
+    )
+    for color in (BLACK, WHITE)
+)
+CASTLING_KEYS = (
+    (BB_H1, POLYGLOT_RANDOM_ARRAY[768]),
+    (BB_A1, POLYGLOT_RANDOM_ARRAY[769]),
+    (BB_H8, POLYGLOT_RANDOM_ARRAY[770]),
+    (BB_A8, POLYGLOT_RANDOM_ARRAY[771]),
+)
+EN_PASSANT_KEYS = tuple(POLYGLOT_RANDOM_ARRAY[772 + file] for file in range(8))
+TURN_KEY = POLYGLOT_RANDOM_ARRAY[780]
+
+
+def castling_key(castling_rights: int) -> int:
+    key = 0
+    for mask, castling_rights_key in CASTLING_KEYS:
+        if castling_rights & mask:
+            key ^= castling_rights_key
+    return key
+
+
 class ExtendedBoard(Board):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -18,6 +48,14 @@ class ExtendedBoard(Board):
             if piece_type_at:
                 self.pieces_map[square] = piece_type_at
 
+        # Rights without matching king and rook would break the incremental castling key
+        self.castling_rights = self.clean_castling_rights()
+        self.zobrist_hash = zobrist_hash(self)
+        self.pawn_hash = self.compute_pawn_hash()
+        self.white_score, self.black_score, self.white_endgame_score, self.black_endgame_score = self.compute_scores()
+        # Incrementally updated values from before each pushed move
+        self.state_stack = []
+
 
     @contextmanager
     def apply(self, move: Move):
@@ -32,33 +70,107 @@ class ExtendedBoard(Board):
             return column_diff < -1 or 1 < column_diff
         return False
 
+    def en_passant_key(self) -> int:
+        # Same rule as polyglot: hash en passant file only if a pawn is ready to capture
+        if self.ep_square:
+            if self.turn == WHITE:
+                ep_mask = shift_down(BB_SQUARES[self.ep_square])
+            else:
+                ep_mask = shift_up(BB_SQUARES[self.ep_square])
+            if (shift_left(ep_mask) | shift_right(ep_mask)) & self.pawns & self.occupied_co[self.turn]:
+                return EN_PASSANT_KEYS[self.ep_square & 7]
+        return 0
+
+    def compute_pawn_hash(self) -> int:
+        """Zobrist key of pawns only, from scratch"""
+        key = 0
+        for color in (BLACK, WHITE):
+            for square in scan_reversed(self.pawns & self.occupied_co[color]):
+                key ^= PIECE_KEYS[color][PAWN][square]
+        return key
+
+    def compute_scores(self) -> tuple:
+        """Material and position sums from scratch, (white, black, white endgame, black endgame)"""
+        scores = [0., 0., 0., 0.]
+        for square, piece_type in self.pieces_map.items():
+            color = bool(self.occupied_co[WHITE] & BB_SQUARES[square])
+            offset = 0 if color == WHITE else 1
+            scores[offset] += MIDDLEGAME_TABLES[color][piece_type][square]
+            scores[offset + 2] += ENDGAME_TABLES[color][piece_type][square]
+        return tuple(scores)
+
     def push(self, move: Move):
-        is_en_passant = self.is_en_passant(move)
-        is_castling = self.is_castling(move)
-        super().push(move)
+        turn = self.turn
+        castling_rights = self.castling_rights
+        self.state_stack.append((self.zobrist_hash, self.white_score, self.black_score, self.white_endgame_score, self.black_endgame_score, self.pawn_hash))
+        key = self.zobrist_hash ^ self.en_passant_key() ^ TURN_KEY
 
         if move.from_square != 0 or move.to_square != 0: # Not null
-            if is_castling:
-                rook_from, rook_to = CASTLING_ROOK_MOVES[(move.from_square, move.to_square)]
+            from_square = move.from_square
+            to_square = move.to_square
+            own_keys = PIECE_KEYS[turn]
+            own_middlegame = MIDDLEGAME_TABLES[turn]
+            own_endgame = ENDGAME_TABLES[turn]
+
+            piece = self.pieces_map.pop(from_square)
+            new_piece = move.promotion or piece
+            key ^= own_keys[piece][from_square] ^ own_keys[new_piece][to_square]
+            if piece == PAWN:
+                self.pawn_hash ^= own_keys[PAWN][from_square]
+                if not move.promotion:
+                    self.pawn_hash ^= own_keys[PAWN][to_square]
+            middlegame_delta = own_middlegame[new_piece][to_square] - own_middlegame[piece][from_square]
+            endgame_delta = own_endgame[new_piece][to_square] - own_endgame[piece][from_square]
+
+            if piece == KING and (from_square, to_square) in CASTLING_ROOK_MOVES:
+                rook_from, rook_to = CASTLING_ROOK_MOVES[(from_square, to_square)]
                 del self.pieces_map[rook_from]
                 self.pieces_map[rook_to] = ROOK
+                key ^= own_keys[ROOK][rook_from] ^ own_keys[ROOK][rook_to]
+                middlegame_delta += own_middlegame[ROOK][rook_to] - own_middlegame[ROOK][rook_from]
+                endgame_delta += own_endgame[ROOK][rook_to] - own_endgame[ROOK][rook_from]
 
-            if is_en_passant:
+            if piece == PAWN and to_square == self.ep_square:
                 # En passant
-                column = move.to_square % 8
-                row = move.from_square // 8
-                del self.pieces_map[8 * row + column]
+                capture_square = 8 * (from_square // 8) + to_square % 8
+                captured_piece = self.pieces_map.pop(capture_square)
+            else:
+                capture_square = to_square
+                captured_piece = self.pieces_map.get(to_square)
+            self.pieces_map[to_square] = new_piece
+
+            if turn == WHITE:
+                self.white_score += middlegame_delta
+                self.white_endgame_score += endgame_delta
+            else:
+                self.black_score += middlegame_delta
+                self.black_endgame_score += endgame_delta
+
+            if captured_piece:
+                key ^= PIECE_KEYS[not turn][captured_piece][capture_square]
+                if captured_piece == PAWN:
+                    self.pawn_hash ^= PIECE_KEYS[not turn][PAWN][capture_square]
+                if turn == WHITE:
+                    self.black_score -= MIDDLEGAME_TABLES[BLACK][captured_piece][capture_square]
+                    self.black_endgame_score -= ENDGAME_TABLES[BLACK][captured_piece][capture_square]
+                else:
+                    self.white_score -= MIDDLEGAME_TABLES[WHITE][captured_piece][capture_square]
+                    self.white_endgame_score -= ENDGAME_TABLES[WHITE][captured_piece][capture_square]
+
+        super().push(move)
 
-            piece = self.pieces_map.pop(move.from_square)
-            self.pieces_map[move.to_square] = piece
+        if castling_rights != self.castling_rights:
+            key ^= castling_key(castling_rights) ^ castling_key(self.castling_rights)
+        self.zobrist_hash = key ^ self.en_passant_key()
 
 
     def pop(self):
         move = super().pop()
+        self.zobrist_hash, self.white_score, self.black_score, self.white_endgame_score, self.black_endgame_score, self.pawn_hash = self.state_stack.pop()
 
         if move.from_square != 0 or move.to_square != 0: # Not null
             piece_type = self.pieces_map.pop(move.to_square)
-            self.pieces_map[move.from_square] = piece_type
+            self.pieces_map[move.from_square] = PAWN if move.promotion else piece_type
             # Assign piece to to_square if it was a capture
             piece_type_at = self.piece_type_at(move.to_square)
             if piece_type_at:
@@ -78,19 +190,32 @@ class ExtendedBoard(Board):
 
     def check_game_over(self) -> int | None:
         """Faster version of board.is_game_over"""
-        # TODO faster versions of used functions (eg use already generated moves to check checkmate)?
-        # TODO add stalemate condition (reuse generate_legal_moves?)
         # Normal game end.
-        if self.is_checkmate():
-            return 1 if not self.turn else -1
-        if self.pawns | self.rooks | self.queens == 0:
-            return 0
         if not any(self.generate_legal_moves()):
+            if self.is_check():
+                return 1 if not self.turn else -1
             return 0
-
-        if self.is_fifty_moves():
-            return 0
-        if self.is_repetition(2):
+        if self.check_draw():
             return 0
 
-        return None
\ No newline at end of file
+        return None
+
+    def check_draw(self) -> bool:
+        """Draws which don't need legal moves, a search detects mate and stalemate from its own move generation"""
+        # Minor pieces rarely mate, but a mate on the board must not be scored as a draw
+        if self.pawns | self.rooks | self.queens == 0 and not (self.is_check() and self.is_checkmate()):
+            return True
+        # Mate on the last move before the fifty moves rule still wins
+        if self.halfmove_clock >= 100 and not self.is_checkmate():
+            return True
+        return self.is_repeated()
+
+    def is_repeated(self) -> bool:
+        """Same as is_repetition(2) by comparing hashes, only positions since the last capture or pawn move can repeat"""
+        key = self.zobrist_hash
+        state_stack = self.state_stack
+        window = min(self.halfmove_clock, len(state_stack))
+        for plies in range(2, window + 1, 2):
+            if state_stack[-plies][0] == key:
+                return True
+        return False
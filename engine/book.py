@@ -0,0 +1,45 @@
+import random
+from collections import OrderedDict
+
+from chess import Move
+from chess.polyglot import open_reader
+
+from engine.board import ExtendedBoard
+
+WEIGHTED = "weighted"
+BEST = "best"
+
+
+class OpeningBook:
+    """Polyglot opening book. The file is memory-mapped and binary searched by python-chess,
+    probes are cached by the incrementally updated Zobrist hash of the board."""
+    def __init__(self, path: str, selection: str = WEIGHTED, seed: int | None = None, cache_size: int = 4096):
+        self.reader = open_reader(path)
+        self.selection = selection
+        self.random = random.Random(seed)
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Zobrist hash -> [(move, weight)], empty list for positions out of book
+
+    def get_moves(self, board: ExtendedBoard) -> list:
+        key = board.zobrist_hash
+        moves = self.cache.get(key)
+        if moves is None:
+            moves = [(entry.move, entry.weight) for entry in self.reader.find_all(board)]
+            self.cache[key] = moves
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return moves
+
+    def probe(self, board: ExtendedBoard) -> Move | None:
+        moves = self.get_moves(board)
+        if not moves:
+            return None
+        if self.selection == BEST:
+            # First entry with the highest weight
+            return max(moves, key=lambda it: it[1])[0]
+        return self.random.choices([move for move, _ in moves], weights=[weight for _, weight in moves])[0]
+
+    def close(self):
+        self.reader.close()
@@ -0,0 +1,124 @@
+"""
+Fixed width binary records of labeled positions for tuning, 32 bytes each:
+occupancy bitboard, a 4 bit piece code for each occupied square (in square order, two per byte, low nibble first),
+side to move, castling rights, en passant square, game result, search score and fullmove number.
+"""
+import os
+
+import numpy as np
+from chess import Board, Piece, BB_SQUARES, BB_A1, BB_H1, BB_A8, BB_H8, WHITE, BLACK, scan_forward
+
+RECORD_DTYPE = np.dtype([
+    ("occupied", "<u8"),
+    ("pieces", "u1", 16),
+    ("turn", "u1"),
+    ("castling", "u1"),  # Bits of white kingside, white queenside, black kingside, black queenside
+    ("ep_square", "u1"),  # NO_EP_SQUARE when there is none
+    ("result", "u1"),  # Game result from white perspective in half points, 0, 1 or 2
+    ("score", "<i2"),  # Search score from white perspective in centipawns
+    ("fullmove_number", "<u2"),
+])
+assert RECORD_DTYPE.itemsize == 32
+
+NO_EP_SQUARE = 64
+MAX_SCORE = 32000  # Mate scores are clamped to it
+CASTLING_ROOKS = (BB_H1, BB_A1, BB_H8, BB_A8)
+BLACK_PIECE_CODE = 8  # Added to the piece type of black pieces
+
+
+def pack_board(board: Board, score: int, result: float) -> np.void:
+    """Record of a board, its score in centipawns and the result of its game (1, 0.5 or 0)"""
+    record = np.zeros((), dtype=RECORD_DTYPE)
+    record["occupied"] = board.occupied
+    codes = [
+        board.piece_type_at(square) + (0 if board.occupied_co[WHITE] & BB_SQUARES[square] else BLACK_PIECE_CODE)
+        for square in scan_forward(board.occupied)
+    ]
+    codes += [0] * (32 - len(codes))
+    record["pieces"] = [low | high << 4 for low, high in zip(codes[::2], codes[1::2])]
+    record["turn"] = board.turn
+    record["castling"] = sum(1 << bit for bit, rook in enumerate(CASTLING_ROOKS) if board.castling_rights & rook)
+    record["ep_square"] = NO_EP_SQUARE if board.ep_square is None else board.ep_square
+    record["result"] = round(result * 2)
+    record["score"] = max(-MAX_SCORE, min(MAX_SCORE, score))
+    record["fullmove_number"] = min(board.fullmove_number, 0xFFFF)
+    return record[()]
+
+
+def unpack_board(record: np.void) -> Board:
+    board = Board(None)
+    codes = [nibble for byte in record["pieces"].tolist() for nibble in (byte & 0xF, byte >> 4)]
+    for square, code in zip(scan_forward(int(record["occupied"])), codes):
+        board.set_piece_at(square, Piece(code & 7, BLACK if code & BLACK_PIECE_CODE else WHITE))
+    board.turn = bool(record["turn"])
+    board.castling_rights = 0
+    for bit, rook in enumerate(CASTLING_ROOKS):
+        if record["castling"] >> bit & 1:
+            board.castling_rights |= rook
+    board.ep_square = None if record["ep_square"] == NO_EP_SQUARE else int(record["ep_square"])
+    board.fullmove_number = int(record["fullmove_number"])
+    return board
+
+
+def unpack_squares(records: np.ndarray) -> np.ndarray:
+    """Occupancy of all records as an (n, 2, 6 * 64) array, same layout as evaluators.unpack_squares"""
+    occupied = np.unpackbits(records["occupied"].astype("<u8").view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    pieces = records["pieces"]
+    codes = np.stack([pieces & 0xF, pieces >> 4], axis=-1).reshape(len(records), 32)
+    # Piece codes follow the occupied squares, the k-th occupied square has the k-th code
+    order = np.clip(np.cumsum(occupied, axis=1) - 1, 0, 31)
+    square_codes = np.where(occupied == 1, np.take_along_axis(codes, order, axis=1), 0)
+
+    squares = np.zeros((len(records), 2, 6 * 64), dtype=np.uint8)
+    rows, columns = np.nonzero(square_codes)
+    board_codes = square_codes[rows, columns]
+    colors = np.where(board_codes & BLACK_PIECE_CODE, int(BLACK), int(WHITE))
+    squares[rows, colors, ((board_codes & 7) - 1).astype(np.intp) * 64 + columns] = 1
+    return squares
+
+
+def load_dataset(path: str) -> np.ndarray:
+    """Records of a file memory-mapped read only, a record cut off by a crash at the end is left out"""
+    count = os.path.getsize(path) // RECORD_DTYPE.itemsize
+    if count == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+
+
+def list_shards(directory: str) -> list[str]:
+    return sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".bin"))
+
+
+class DatasetWriter:
+    """Appends records to a file, buffered so that they are written with a few large writes.
+    Each process must have its own file."""
+    def __init__(self, path: str, buffer_size: int = 4096):
+        self.file = open(path, "ab")
+        # A record cut off by a crash would shift all records appended after it
+        size = self.file.tell()
+        self.file.truncate(size - size % RECORD_DTYPE.itemsize)
+        self.buffer = np.zeros(buffer_size, dtype=RECORD_DTYPE)
+        self.buffered = 0
+        self.written = 0
+
+    def write(self, record: np.void):
+        self.buffer[self.buffered] = record
+        self.buffered += 1
+        if self.buffered == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        self.file.write(self.buffer[:self.buffered].tobytes())
+        self.file.flush()
+        self.written += self.buffered
+        self.buffered = 0
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -1,11 +1,45 @@
 import abc
+import os
 import random
+from array import array
 
-from chess import Board, PAWN,KNIGHT,BISHOP,ROOK,QUEEN,KING,SQUARES_180,BB_SQUARES,WHITE,BLACK, lsb
+import numpy as np
+from chess import Board, PAWN,KNIGHT,BISHOP,ROOK,QUEEN,KING,SQUARES_180,BB_SQUARES,WHITE,BLACK, lsb, PIECE_TYPES
+from chess.polyglot import zobrist_hash
 
 from engine.board import ExtendedBoard
+from engine.pawn_structure import PawnHashTable, evaluate_pawn_structure
+from engine.piece_square_tables import PIECE_VALUES, ENDGAME_FULLMOVE_NUMBER, MIDDLEGAME_TABLES, ENDGAME_TABLES
 
 MATE_EVALUATION = 1000
+NOISE_SCALE = 0.01
+NOISE_MULTIPLIER = 0x9E3779B97F4A7C15  # Spreads nearby keys over the whole noise range
+ENDGAME_CACHE_KEY = 0xD6E8FEB86659FD93  # Mixed into cache keys of positions evaluated with the endgame tables
+
+# Piece square tables for batched evaluation, indexed by [color][(piece_type - 1) * 64 + square]
+MIDDLEGAME_ARRAY = np.array([np.concatenate([MIDDLEGAME_TABLES[color][piece_type] for piece_type in PIECE_TYPES]) for color in (BLACK, WHITE)])
+ENDGAME_ARRAY = np.array([np.concatenate([ENDGAME_TABLES[color][piece_type] for piece_type in PIECE_TYPES]) for color in (BLACK, WHITE)])
+
+
+def pack_bitboards(boards: list) -> np.ndarray:
+    """Piece bitboards as an (n, 2, 6) array indexed by [board][color][piece_type - 1]"""
+    return np.array(
+        [
+            [
+                [board.pawns & occupied, board.knights & occupied, board.bishops & occupied,
+                 board.rooks & occupied, board.queens & occupied, board.kings & occupied]
+                for occupied in (board.occupied_co[BLACK], board.occupied_co[WHITE])
+            ]
+            for board in boards
+        ],
+        dtype="<u8",
+    ).reshape(len(boards), 2, 6)
+
+
+def unpack_squares(bitboards: np.ndarray) -> np.ndarray:
+    """Bitboards from pack_bitboards as (n, 2, 6 * 64) occupancy, matching the table layout"""
+    squares = np.unpackbits(bitboards.view(np.uint8), axis=-1, bitorder="little")
+    return squares.reshape(len(bitboards), 2, 6 * 64)
 
 
 class BaseEvaluator:
@@ -13,6 +47,9 @@ class BaseEvaluator:
     def evaluate(self, board: Board):
         pass
 
+    def evaluate_many(self, boards: list) -> np.ndarray:
+        return np.array([self.evaluate(board) for board in boards], dtype=float)
+
 
 class BasicMaterialEvaluator(BaseEvaluator):
     VALUE_DICT = {
@@ -39,43 +76,21 @@ class BasicMaterialEvaluator(BaseEvaluator):
         return evaluation
 
 
-PAWN_ADVANCE_COEFFICIENT = 0.03
-PIECE_CENTRALIZED_COEFFICIENT = -0.015
-ROOK_ACTIVE_COEFFICIENT = 0.02
-KING_COEFFICIENT = 0.01
-QUEEN_COEFFICIENT = 0.03
-CENTRAL_COLUMNS = (3, 4)
-PAWN_POSITION_EVALUATION = tuple(
-    PAWN_ADVANCE_COEFFICIENT * row if column in CENTRAL_COLUMNS else 0
-    for row in range(8) for column in range(8)
-)
-PIECE_POSITION_EVALUATION = tuple(
-    PIECE_CENTRALIZED_COEFFICIENT * (abs(3.5 - row) + abs(3.5 - column)) if row < 2 or row > 5 or column < 2 or row > 5 else 0
-    for row in range(8) for column in range(8)
-)
-ROOK_POSITION_EVALUATION = tuple(
-    ROOK_ACTIVE_COEFFICIENT * (abs(3.5 - row) - abs(3.5 - column))
-    for row in range(8) for column in range(8)
-)
-KING_POSITION_EVALUATION = tuple(
-    KING_COEFFICIENT * (abs(3.5 - row) + abs(3.5 - column))
-    for row in range(8) for column in range(8)
-)
-QUEEN_POSITION_EVALUATION = tuple(
-    QUEEN_COEFFICIENT * (abs(1 - row) + abs(3.5 - column))
-    for row in range(8) for column in range(8)
-)
-
 class V0Evaluator(BaseEvaluator):
     VALUE_DICT = {
-        PAWN: 1,
-        KNIGHT: 3,
-        BISHOP: 3.01,
-        ROOK: 5,
-        QUEEN: 9,
-        KING: 0,
+        **PIECE_VALUES,
         0: 0,
     }
+    def __init__(self, noise: bool = True):
+        # Disabled for reproducible searches, eg. bench.py
+        self.noise = noise
+        # Noise is a function of the position, the seed makes it different in each game.
+        # Not from random, forked Pool workers share its state
+        self.noise_seed = int.from_bytes(os.urandom(8), "little")
+
+    def get_noise(self, key: int) -> float:
+        return (((key ^ self.noise_seed) * NOISE_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) / (1 << 64) * NOISE_SCALE
+
     def evaluate(self, board: ExtendedBoard) -> float:
         # TODO check for checkmate in an efficient way
         # if board.is_checkmate():
@@ -84,53 +99,34 @@ class V0Evaluator(BaseEvaluator):
 
         evaluation = self._evaluate_material(board) + self._evaluate_position(board)
         # Add tiny random number to avoid having the same result for different positions
-        return evaluation + random.uniform(0, 0.01)
+        if self.noise:
+            evaluation += self.get_noise(board.zobrist_hash)
+        return evaluation
+
+    def evaluate_many(self, boards: list) -> np.ndarray:
+        """Same as evaluate for each board, material and piece positions are summed for all boards at once.
+        Works with any chess.Board, the incremental scores of ExtendedBoard are not used."""
+        if not boards:
+            return np.zeros(0)
+        squares = unpack_squares(pack_bitboards(boards))
+        # Scores indexed by [board][color]
+        middlegame_scores = np.einsum("ncx,cx->nc", squares, MIDDLEGAME_ARRAY)
+        endgame_scores = np.einsum("ncx,cx->nc", squares, ENDGAME_ARRAY)
+        is_endgame = np.array([board.fullmove_number > ENDGAME_FULLMOVE_NUMBER for board in boards])
+        scores = np.where(is_endgame[:, None], endgame_scores, middlegame_scores)
+
+        # Colors are plain ints here, a bool would be taken as a mask
+        evaluations = self._evaluate_material_many(scores[:, int(WHITE)], scores[:, int(BLACK)])
+        evaluations += np.array([self._evaluate_position(board) for board in boards])
+        if self.noise:
+            evaluations += [self.get_noise(board.zobrist_hash if isinstance(board, ExtendedBoard) else zobrist_hash(board)) for board in boards]
+        return evaluations
 
     def _evaluate_position(self, board: ExtendedBoard) -> float:
         evaluation = 0.
         evaluation += self._evaluate_checks(board)
         return evaluation
 
-    def _evaluate_piece_position(self, board: ExtendedBoard, piece_type, square, color):
-        is_endgame = board.fullmove_number > 60
-        # Pawn and piece position
-        if piece_type == PAWN:
-            # TODO implement endgame evaluation
-            if color == BLACK:
-                row = square // 8
-                column = square % 8
-                square = 8*(7-row) + column
-            return PAWN_POSITION_EVALUATION[square]
-            # # Bonus on advanced pieces
-            # if column in CENTRAL_COLUMNS or is_endgame: # Central in middlegame, all in endgame
-            #     if color == BLACK:
-            #         row = (7-row)
-            #     return self.pawn_advance_coefficient * row
-
-        if piece_type in (KNIGHT, BISHOP):
-            # Bonus on centralized pieces (in extended center)
-            return PIECE_POSITION_EVALUATION[square]
-        if piece_type == ROOK:
-            # Move to center columns but avoid center rows
-            return ROOK_POSITION_EVALUATION[square]
-        if piece_type == KING:
-            # King position
-            sign = 1
-            # TODO what distance works best
-            if is_endgame:  # TODO better condition
-                # Centralized king is good in endgame
-                sign *= -1
-            return sign * KING_POSITION_EVALUATION[square]  # TODO find coefficient
-
-        if piece_type == QUEEN:
-            if not is_endgame:
-                if color == BLACK:
-                    row = square // 8
-                    column = square % 8
-                    square = 8 * (7 - row) + column
-                return QUEEN_POSITION_EVALUATION[square]
-            return 0.
-
     def _evaluate_checks(self, board: ExtendedBoard) -> float:
         turn_sign = -1 if board.turn else 1
         if board.is_check():
@@ -139,17 +135,13 @@ class V0Evaluator(BaseEvaluator):
         return 0.
 
     def _evaluate_material(self, board: ExtendedBoard) -> float:
-        white_material = black_material = 0
-        # Calculate material
-        for square, piece_type in board.pieces_map.items():
-            color = bool(board.occupied_co[WHITE] & BB_SQUARES[square])
-
-            piece_position = self._evaluate_piece_position(board, piece_type, square, color)
-            piece_value = self.VALUE_DICT[piece_type] + piece_position
-            if color == WHITE:
-                white_material += piece_value
-            else:
-                black_material += piece_value
+        # Material and piece positions are updated incrementally by the board
+        if board.fullmove_number > ENDGAME_FULLMOVE_NUMBER:
+            white_material = board.white_endgame_score
+            black_material = board.black_endgame_score
+        else:
+            white_material = board.white_score
+            black_material = board.black_score
 
         # Bonus to winning advantage in endgame
         worse_material = white_material if white_material < black_material else black_material
@@ -179,3 +171,77 @@ class V0Evaluator(BaseEvaluator):
                 material_difference -= percentage_left
 
         return material_difference
+
+    @staticmethod
+    def _evaluate_material_many(white_material: np.ndarray, black_material: np.ndarray) -> np.ndarray:
+        # Vectorized _evaluate_material, NaN marks boards without the endgame cutoff
+        worse_material = np.minimum(white_material, black_material)
+        better_material = np.maximum(white_material, black_material)
+        cutoff_result = np.full(len(white_material), np.nan)
+        cutoff_result = np.where((worse_material == 0) & (better_material >= 5), 10. + better_material, cutoff_result)
+        cutoff_result = np.where((worse_material == 0) & (better_material >= 6.5), 50. + better_material, cutoff_result)
+        cutoff_result = np.where((0 < worse_material) & (worse_material < 2) & (better_material >= 10), 10. + better_material, cutoff_result)
+        cutoff_result = np.where(black_material > white_material, -cutoff_result, cutoff_result)
+
+        material_difference = white_material - black_material
+        percentage_left = (white_material + black_material) / 78.
+        simplification = np.where(np.abs(material_difference) > 1.95, np.sign(material_difference) * percentage_left, 0.)
+        return np.where(np.isnan(cutoff_result), material_difference + simplification, cutoff_result)
+
+
+class V1Evaluator(V0Evaluator):
+    """V0Evaluator with doubled, isolated and passed pawn terms, cached by the pawn Zobrist key of ExtendedBoard"""
+    def __init__(self, noise: bool = True, pawn_table_size_bits: int = 14):
+        super().__init__(noise)
+        self.pawn_table = PawnHashTable(pawn_table_size_bits)
+
+    def _evaluate_position(self, board: ExtendedBoard) -> float:
+        return super()._evaluate_position(board) + self._evaluate_pawn_structure(board)
+
+    def _evaluate_pawn_structure(self, board: ExtendedBoard) -> float:
+        white_pawns = board.pawns & board.occupied_co[WHITE]
+        black_pawns = board.pawns & board.occupied_co[BLACK]
+        if not isinstance(board, ExtendedBoard):
+            # Plain board from evaluate_many, no incremental pawn key
+            return evaluate_pawn_structure(white_pawns, black_pawns)
+        evaluation = self.pawn_table.probe(board.pawn_hash)
+        if evaluation is None:
+            evaluation = evaluate_pawn_structure(white_pawns, black_pawns)
+            self.pawn_table.store(board.pawn_hash, evaluation)
+        return evaluation
+
+
+class CachedEvaluator(BaseEvaluator):
+    """Direct-mapped cache in front of another evaluator, keyed by the Zobrist hash of ExtendedBoard and the game phase.
+    Wrapped evaluation must depend only on the position and the phase, a colliding position replaces the older one."""
+    def __init__(self, evaluator: BaseEvaluator, size_bits: int = 16):
+        self.evaluator = evaluator
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.keys = array("Q", bytes(8 * self.size))
+        self.scores = array("d", bytes(8 * self.size))
+        self.hits = 0
+        self.misses = 0
+
+    def evaluate(self, board: ExtendedBoard) -> float:
+        key = board.zobrist_hash
+        if board.fullmove_number > ENDGAME_FULLMOVE_NUMBER:
+            # Same position is evaluated with the endgame tables after that move
+            key ^= ENDGAME_CACHE_KEY
+        index = key & self.mask
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.scores[index]
+        self.misses += 1
+        score = self.evaluator.evaluate(board)
+        self.keys[index] = key
+        self.scores[index] = score
+        return score
+
+    def evaluate_many(self, boards: list) -> np.ndarray:
+        return self.evaluator.evaluate_many(boards)
+
+    def clear(self):
+        self.keys = array("Q", bytes(8 * self.size))
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,104 @@
+import random
+from multiprocessing import Pool, Event
+
+from chess import Board
+from chess.engine import PlayResult, Limit
+
+from engine.base import ExpectedTimeoutException
+from engine.basilisk import BasiliskEngine
+from engine.board import ExtendedBoard
+from engine.book import OpeningBook
+from engine.evaluators import BaseEvaluator
+from engine.tablebase import Tablebase
+from engine.transposition import SharedTranspositionTable
+
+# Engine of a helper process, created by the pool initializer
+_helper = None
+
+
+class HelperEngine(BasiliskEngine):
+    """Searches the same root as the main engine, perturbed so helpers fill the shared table with different lines"""
+    def __init__(self, evaluator: BaseEvaluator, transposition_table: SharedTranspositionTable, stop_event: Event):
+        super().__init__(evaluator)
+        self.transposition_table = transposition_table
+        self.stop_event = stop_event
+        self.random = random.Random()
+
+    def check_timeout(self):
+        # Helpers search until the main process finishes, checking the shared event is slow so not at every node
+        if self.visited_nodes & 255 == 0 and self.stop_event.is_set():
+            raise ExpectedTimeoutException()
+
+    def perturb(self, helper_index: int):
+        self.min_depth = 2 + helper_index % 2
+        self.random.seed(helper_index)
+
+    def get_legal_moves(self, hash_move=None, ply: int = 0):
+        if ply != 0:
+            return super().get_legal_moves(hash_move, ply)
+        # Keep the first (hash) move, shuffle the rest of the root moves
+        moves = list(super().get_legal_moves(hash_move, ply))
+        rest = moves[1:]
+        self.random.shuffle(rest)
+        return moves[:1] + rest
+
+
+def _init_helper(evaluator: BaseEvaluator, table_name: str, size_bits: int, stop_event: Event):
+    global _helper
+    _helper = HelperEngine(evaluator, SharedTranspositionTable(size_bits, name=table_name), stop_event)
+
+
+def _search_helper(fen: str, depth: int | None, helper_index: int):
+    _helper.perturb(helper_index)
+    _helper.visited_nodes = 0
+    _helper.play(ExtendedBoard(fen), Limit(depth=depth))
+    return _helper.completed_depth, _helper.completed_line, _helper.completed_evaluation, _helper.visited_nodes
+
+
+class LazySMPEngine(BasiliskEngine):
+    """BasiliskEngine searching with several processes sharing one transposition table.
+    Helper processes don't communicate with the main search other than through the table,
+    the move from the deepest completed iteration is played."""
+    def __init__(self, evaluator: BaseEvaluator, processes: int = 4, size_bits: int = 20, book: OpeningBook | None = None, tablebase: Tablebase | None = None):
+        super().__init__(evaluator, book, tablebase)
+        self.processes = processes
+        self.transposition_table = SharedTranspositionTable(size_bits)
+        self.stop_event = Event()
+        # Can't be created inside a daemonic process, eg. a rungame.py Pool worker
+        self.pool = Pool(processes - 1, initializer=_init_helper, initargs=(evaluator, self.transposition_table.name, size_bits, self.stop_event))
+
+    def play(self, board: Board, limit: Limit):
+        fen = board.fen()
+        # Moves which don't need a search
+        self.board = ExtendedBoard(fen)
+        instant_move = self.get_book_move()
+        if instant_move is None and self.tablebase is not None:
+            instant_move = self.tablebase.probe_root(self.board)
+        if instant_move is not None:
+            return PlayResult(instant_move, None)
+        self.stop_event.clear()
+        helper_results = [
+            self.pool.apply_async(_search_helper, (fen, limit.depth, helper_index))
+            for helper_index in range(1, self.processes)
+        ]
+        play_result = super().play(board, limit)
+        self.stop_event.set()
+
+        best_depth = self.completed_depth
+        best_line = best_evaluation = None
+        for helper_result in helper_results:
+            depth, line, evaluation, visited_nodes = helper_result.get()
+            self.visited_nodes += visited_nodes
+            if depth > best_depth and line:
+                best_depth, best_line, best_evaluation = depth, line, evaluation
+        if best_line is not None:
+            # Line and score of the helper, nodes of all processes
+            ponder = best_line[1] if len(best_line) > 1 else None
+            play_result = PlayResult(best_line[0], ponder, self.get_info(best_depth, best_line, best_evaluation))
+        return play_result
+
+    def quit(self):
+        super().quit()
+        self.pool.terminate()
+        self.pool.join()
+        self.transposition_table.close()
@@ -0,0 +1,68 @@
+from chess import BB_FILES, BB_RANKS, WHITE, BLACK, popcount, scan_forward, square_file, square_rank
+
+DOUBLED_PAWN_PENALTY = 0.15  # For each pawn behind another one on the same file
+ISOLATED_PAWN_PENALTY = 0.1
+PASSED_PAWN_BONUS = (0, 0.05, 0.1, 0.2, 0.35, 0.6, 1., 0)  # Indexed by rank from the pawn's side
+
+ADJACENT_FILES = tuple(
+    (BB_FILES[file - 1] if file > 0 else 0) | (BB_FILES[file + 1] if file < 7 else 0)
+    for file in range(8)
+)
+
+
+def _passed_pawn_mask(color: bool, square: int) -> int:
+    # Squares in front of the pawn on its own and adjacent files
+    files = BB_FILES[square_file(square)] | ADJACENT_FILES[square_file(square)]
+    rank = square_rank(square)
+    ranks = range(rank + 1, 8) if color == WHITE else range(0, rank)
+    front = 0
+    for front_rank in ranks:
+        front |= BB_RANKS[front_rank]
+    return files & front
+
+
+# Enemy pawns which stop a pawn from being passed, indexed by [color][square]
+PASSED_PAWN_MASKS = tuple(tuple(_passed_pawn_mask(color, square) for square in range(64)) for color in (BLACK, WHITE))
+
+
+def evaluate_pawn_structure(white_pawns: int, black_pawns: int) -> float:
+    """Doubled, isolated and passed pawn terms from white perspective"""
+    evaluation = 0.
+    for color, own_pawns, enemy_pawns, sign in ((WHITE, white_pawns, black_pawns, 1), (BLACK, black_pawns, white_pawns, -1)):
+        for file in range(8):
+            file_pawns = popcount(own_pawns & BB_FILES[file])
+            if file_pawns > 1:
+                evaluation -= sign * DOUBLED_PAWN_PENALTY * (file_pawns - 1)
+            if file_pawns and not own_pawns & ADJACENT_FILES[file]:
+                evaluation -= sign * ISOLATED_PAWN_PENALTY * file_pawns
+        for square in scan_forward(own_pawns):
+            if not enemy_pawns & PASSED_PAWN_MASKS[color][square]:
+                rank = square_rank(square) if color == WHITE else 7 - square_rank(square)
+                evaluation += sign * PASSED_PAWN_BONUS[rank]
+    return evaluation
+
+
+class PawnHashTable:
+    def __init__(self, size_bits: int = 14):
+        # Entries are (pawn key, evaluation) tuples, pawn structure repeats along search paths so most probes hit
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key: int) -> float | None:
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, evaluation: float):
+        self.entries[key & self.mask] = (key, evaluation)
+
+    def clear(self):
+        self.entries = [None] * self.size
+        self.hits = 0
+        self.misses = 0
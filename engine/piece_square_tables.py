@@ -0,0 +1,107 @@
+from chess import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, WHITE, BLACK, PIECE_TYPES
+
+PIECE_VALUES = {
+    PAWN: 1,
+    KNIGHT: 3,
+    BISHOP: 3.01,
+    ROOK: 5,
+    QUEEN: 9,
+    KING: 0,
+}
+ENDGAME_FULLMOVE_NUMBER = 60  # TODO better endgame condition
+
+PAWN_ADVANCE_COEFFICIENT = 0.03
+PIECE_CENTRALIZED_COEFFICIENT = -0.015
+ROOK_ACTIVE_COEFFICIENT = 0.02
+KING_COEFFICIENT = 0.01
+QUEEN_COEFFICIENT = 0.03
+CENTRAL_COLUMNS = (3, 4)
+# Position bonus tables for a unit coefficient
+PAWN_POSITION_EVALUATION = tuple(
+    row if column in CENTRAL_COLUMNS else 0
+    for row in range(8) for column in range(8)
+)
+PIECE_POSITION_EVALUATION = tuple(
+    (abs(3.5 - row) + abs(3.5 - column)) if row < 2 or row > 5 or column < 2 or row > 5 else 0
+    for row in range(8) for column in range(8)
+)
+ROOK_POSITION_EVALUATION = tuple(
+    (abs(3.5 - row) - abs(3.5 - column))
+    for row in range(8) for column in range(8)
+)
+KING_POSITION_EVALUATION = tuple(
+    (abs(3.5 - row) + abs(3.5 - column))
+    for row in range(8) for column in range(8)
+)
+QUEEN_POSITION_EVALUATION = tuple(
+    (abs(1 - row) + abs(3.5 - column))
+    for row in range(8) for column in range(8)
+)
+
+COEFFICIENT_NAMES = (
+    "PAWN_ADVANCE_COEFFICIENT", "PIECE_CENTRALIZED_COEFFICIENT", "ROOK_ACTIVE_COEFFICIENT", "KING_COEFFICIENT", "QUEEN_COEFFICIENT",
+)
+COEFFICIENTS = (PAWN_ADVANCE_COEFFICIENT, PIECE_CENTRALIZED_COEFFICIENT, ROOK_ACTIVE_COEFFICIENT, KING_COEFFICIENT, QUEEN_COEFFICIENT)
+
+
+def piece_position_features(piece_type: int, square: int, color: bool, is_endgame: bool) -> tuple:
+    """Position bonus of a piece for a unit value of each coefficient, in COEFFICIENT_NAMES order"""
+    features = [0.] * len(COEFFICIENT_NAMES)
+    # Pawn and piece position
+    if piece_type == PAWN:
+        # TODO implement endgame evaluation
+        if color == BLACK:
+            row = square // 8
+            column = square % 8
+            square = 8*(7-row) + column
+        features[0] = PAWN_POSITION_EVALUATION[square]
+        # # Bonus on advanced pieces
+        # if column in CENTRAL_COLUMNS or is_endgame: # Central in middlegame, all in endgame
+        #     if color == BLACK:
+        #         row = (7-row)
+        #     return self.pawn_advance_coefficient * row
+
+    if piece_type in (KNIGHT, BISHOP):
+        # Bonus on centralized pieces (in extended center)
+        features[1] = PIECE_POSITION_EVALUATION[square]
+    if piece_type == ROOK:
+        # Move to center columns but avoid center rows
+        features[2] = ROOK_POSITION_EVALUATION[square]
+    if piece_type == KING:
+        # King position
+        sign = 1
+        # TODO what distance works best
+        if is_endgame:  # TODO better condition
+            # Centralized king is good in endgame
+            sign *= -1
+        features[3] = sign * KING_POSITION_EVALUATION[square]  # TODO find coefficient
+
+    if piece_type == QUEEN:
+        if not is_endgame:
+            if color == BLACK:
+                row = square // 8
+                column = square % 8
+                square = 8 * (7 - row) + column
+            features[4] = QUEEN_POSITION_EVALUATION[square]
+    return tuple(features)
+
+
+def evaluate_piece_position(piece_type: int, square: int, color: bool, is_endgame: bool, coefficients: tuple = COEFFICIENTS) -> float:
+    features = piece_position_features(piece_type, square, color, is_endgame)
+    return sum(coefficient * feature for coefficient, feature in zip(coefficients, features))
+
+
+def build_tables(is_endgame: bool, piece_values: dict = PIECE_VALUES, coefficients: tuple = COEFFICIENTS) -> tuple:
+    # Piece value plus position bonus, indexed by [color][piece_type][square]
+    return tuple(
+        tuple(
+            tuple(piece_values[piece_type] + evaluate_piece_position(piece_type, square, color, is_endgame, coefficients) for square in range(64))
+            if piece_type else ()
+            for piece_type in (0, *PIECE_TYPES)
+        )
+        for color in (BLACK, WHITE)
+    )
+
+
+MIDDLEGAME_TABLES = build_tables(is_endgame=False)
+ENDGAME_TABLES = build_tables(is_endgame=True)
@@ -0,0 +1,32 @@
+import math
+
+H0 = "H0"  # Elo is elo0 or lower, the change is rejected
+H1 = "H1"  # Elo is elo1 or higher, the change is accepted
+
+
+def expected_score(elo: float) -> float:
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def log_likelihood_ratio(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """Generalized SPRT log-likelihood ratio of elo1 against elo0, scores approximated by a normal distribution"""
+    games = wins + draws + losses
+    if games == 0:
+        return 0.
+    score = (wins + draws / 2) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    if variance == 0:
+        return 0.
+    score0 = expected_score(elo0)
+    score1 = expected_score(elo1)
+    return games * (score1 - score0) * (2 * score - score0 - score1) / (2 * variance)
+
+
+def sprt(wins: int, draws: int, losses: int, elo0: float = 0., elo1: float = 10., alpha: float = 0.05, beta: float = 0.05) -> tuple:
+    """(H0, H1 or None when more games are needed, log-likelihood ratio)"""
+    llr = log_likelihood_ratio(wins, draws, losses, elo0, elo1)
+    if llr >= math.log((1 - beta) / alpha):
+        return H1, llr
+    if llr <= math.log(beta / (1 - alpha)):
+        return H0, llr
+    return None, llr
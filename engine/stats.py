@@ -0,0 +1,81 @@
+import json
+import os
+from collections import defaultdict
+
+
+class SearchStats:
+    """Counters of one search. Updated by the engine only when stats are enabled,
+    nodes and time are taken at iteration boundaries so per node cost is only the evaluator counter."""
+    def __init__(self, fen: str):
+        self.fen = fen
+        self.iterations = []  # (depth, nodes, seconds) of each completed iteration
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.evaluations = 0
+        # Aborted iteration, its nodes and time are lost
+        self.aborted_depth = None
+        self.wasted_nodes = 0
+        self.wasted_time = 0.
+
+    def add_iteration(self, depth: int, nodes: int, seconds: float):
+        self.iterations.append((depth, nodes, seconds))
+
+    def abort_iteration(self, depth: int, nodes: int, seconds: float):
+        self.aborted_depth = depth
+        self.wasted_nodes = nodes
+        self.wasted_time = seconds
+
+    def to_dict(self) -> dict:
+        nodes = [iteration_nodes for _, iteration_nodes, _ in self.iterations]
+        # Growth of the tree with each iteration, the last one is the most meaningful
+        branching_factors = [current / previous for previous, current in zip(nodes, nodes[1:]) if previous]
+        return {
+            "fen": self.fen,
+            "pid": os.getpid(),
+            "depths": [depth for depth, _, _ in self.iterations],
+            "nodes_per_depth": nodes,
+            "time_per_depth": [seconds for _, _, seconds in self.iterations],
+            "nodes": sum(nodes) + self.wasted_nodes,
+            "beta_cutoffs": self.beta_cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.beta_cutoffs if self.beta_cutoffs else None,
+            "effective_branching_factor": branching_factors[-1] if branching_factors else None,
+            "evaluations": self.evaluations,
+            "aborted_depth": self.aborted_depth,
+            "wasted_nodes": self.wasted_nodes,
+            "wasted_time": self.wasted_time,
+        }
+
+
+class StatsCollector:
+    """Appends stats of each search as a JSON line. Every line is written with a single append,
+    so processes of a Pool can share the file."""
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, stats: SearchStats):
+        line = json.dumps(stats.to_dict()) + "\n"
+        with open(self.path, "a") as file:
+            file.write(line)
+
+
+def aggregate(path: str) -> dict:
+    """Totals over all searches in a stats file"""
+    totals = defaultdict(float)
+    searches = 0
+    branching_factors = []
+    with open(path) as file:
+        for line in file:
+            record = json.loads(line)
+            searches += 1
+            for key in ("nodes", "beta_cutoffs", "first_move_cutoffs", "evaluations", "wasted_nodes", "wasted_time"):
+                totals[key] += record[key]
+            if record["effective_branching_factor"] is not None:
+                branching_factors.append(record["effective_branching_factor"])
+    return {
+        "searches": searches,
+        **totals,
+        "first_move_cutoff_rate": totals["first_move_cutoffs"] / totals["beta_cutoffs"] if totals["beta_cutoffs"] else None,
+        "effective_branching_factor": sum(branching_factors) / len(branching_factors) if branching_factors else None,
+        "wasted_node_share": totals["wasted_nodes"] / totals["nodes"] if totals["nodes"] else None,
+    }
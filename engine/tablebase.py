@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+from chess import Move, popcount
+from chess.syzygy import open_tablebase
+
+from engine.board import ExtendedBoard
+
+MISSING = object()  # Cached result of a position without a table
+
+
+class Tablebase:
+    """Local Syzygy tables, WDL results are cached by the Zobrist hash of the board"""
+    def __init__(self, directory: str, max_pieces: int = 5, cache_size: int = 65536):
+        self.tablebase = open_tablebase(directory)
+        self.max_pieces = max_pieces
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # Zobrist hash -> WDL from side to move perspective
+        self.hits = 0
+        self.misses = 0
+
+    def can_probe(self, board: ExtendedBoard) -> bool:
+        # Syzygy tables don't contain positions with castling rights
+        return popcount(board.occupied) <= self.max_pieces and not board.castling_rights
+
+    def probe_wdl(self, board: ExtendedBoard) -> int | None:
+        if not self.can_probe(board):
+            return None
+
+        key = board.zobrist_hash
+        wdl = self.cache.get(key)
+        if wdl is None:
+            self.misses += 1
+            wdl = self.tablebase.get_wdl(board, MISSING)
+            self.cache[key] = wdl
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        return None if wdl is MISSING else wdl
+
+    def probe_root(self, board: ExtendedBoard) -> Move | None:
+        """Best move by DTZ: keep the best WDL, then zero the fifty move counter or get closest to it"""
+        if not self.can_probe(board):
+            return None
+
+        best_move = None
+        best_key = None
+        for move in board.legal_moves:
+            is_zeroing = board.is_zeroing(move)
+            with board.apply(move):
+                if board.is_checkmate():
+                    return move
+                wdl = self.tablebase.get_wdl(board)
+                dtz = self.tablebase.get_dtz(board)
+            if wdl is None or dtz is None:
+                return None  # Missing table, leave the move to the search
+
+            # Child values are from the opponent perspective
+            move_key = (-wdl, 0 if is_zeroing and wdl < 0 else dtz)
+            if best_key is None or move_key > best_key:
+                best_key = move_key
+                best_move = move
+        return best_move
+
+    def close(self):
+        self.tablebase.close()
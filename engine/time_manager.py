@@ -0,0 +1,47 @@
+import time
+
+from chess import Board
+from chess.engine import Limit
+
+TIMEOUT_CHECK_INTERVAL = 128  # Nodes between clock polls, power of two
+SAFETY_MARGIN = 0.01  # Leave some time for cleanup
+DEFAULT_MOVES_TO_GO = 30
+INCREMENT_USAGE = 0.75
+MAX_SOFT_LIMIT_OVERRUN = 4  # Hard limit as a multiple of the soft limit
+MAX_CLOCK_USAGE = 0.25  # Hard limit as part of the remaining clock
+
+
+class TimeManager:
+    """Time for one move. The soft limit decides whether to start another iteration of iterative deepening,
+    the search is aborted only after the hard limit. Both are None for a search which runs until stopped."""
+    def __init__(self, board: Board, limit: Limit):
+        self.start_time = time.time()
+        self.soft_limit, self.hard_limit = self.allocate(board, limit)
+
+    @staticmethod
+    def allocate(board: Board, limit: Limit) -> tuple:
+        if limit.time is not None:
+            # Fixed time per move, whole time can be used
+            hard_limit = limit.time - SAFETY_MARGIN
+            return hard_limit, hard_limit
+
+        clock = limit.white_clock if board.turn else limit.black_clock
+        if clock is None:
+            return None, None
+        increment = (limit.white_inc if board.turn else limit.black_inc) or 0
+        moves_to_go = limit.remaining_moves or DEFAULT_MOVES_TO_GO
+
+        # Split remaining clock across expected moves, increment is added back after the move
+        soft_limit = clock / moves_to_go + INCREMENT_USAGE * increment
+        hard_limit = min(MAX_SOFT_LIMIT_OVERRUN * soft_limit, MAX_CLOCK_USAGE * clock + increment, clock - SAFETY_MARGIN)
+        hard_limit = max(hard_limit - SAFETY_MARGIN, 0)
+        return min(soft_limit, hard_limit), hard_limit
+
+    def elapsed(self) -> float:
+        return time.time() - self.start_time
+
+    def can_start_iteration(self) -> bool:
+        return self.soft_limit is None or self.elapsed() < self.soft_limit
+
+    def is_time_up(self) -> bool:
+        return self.hard_limit is not None and self.elapsed() > self.hard_limit
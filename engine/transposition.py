@@ -0,0 +1,92 @@
+from multiprocessing.shared_memory import SharedMemory
+
+from chess import Move
+
+EXACT = 0
+LOWER_BOUND = 1  # Real evaluation is >= stored score (fail high)
+UPPER_BOUND = 2  # Real evaluation is <= stored score (fail low)
+
+
+class TranspositionTable:
+    def __init__(self, size_bits: int = 18):
+        # Entries are (key, depth, bound, score, best_move) tuples, the slot is chosen by the lowest key bits
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.entries = [None] * self.size
+
+    def probe(self, key: int) -> tuple | None:
+        entry = self.entries[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: float, best_move: Move | None):
+        index = key & self.mask
+        entry = self.entries[index]
+        # Keep deeper result of the same position, always replace other positions
+        if entry is not None and entry[0] == key and entry[1] > depth:
+            return
+        self.entries[index] = (key, depth, bound, score, best_move)
+
+    def clear(self):
+        self.entries = [None] * self.size
+
+
+SCORE_SCALE = 100000  # Scores are stored as fixed point integers in shared memory
+MAX_STORED_SCORE = (1 << 31) - 1
+
+
+def encode_move(move: Move | None) -> int:
+    if move is None:
+        return 0
+    return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+
+
+def decode_move(code: int) -> Move | None:
+    if code == 0:
+        return None
+    return Move(code & 63, code >> 6 & 63, code >> 12 or None)
+
+
+class SharedTranspositionTable:
+    """Transposition table in shared memory, so several processes can search with the same table.
+    There are no locks, the key is stored xor-ed with the data word, so an entry torn by concurrent
+    writes is seen as a miss."""
+    def __init__(self, size_bits: int = 18, name: str | None = None):
+        self.size = 1 << size_bits
+        self.mask = self.size - 1
+        self.is_owner = name is None
+        self.shared_memory = SharedMemory(name=name, create=self.is_owner, size=self.size * 16)
+        self.name = self.shared_memory.name
+        # Two words per entry: key ^ data, data
+        self.words = self.shared_memory.buf.cast("Q")
+
+    def probe(self, key: int) -> tuple | None:
+        index = (key & self.mask) << 1
+        data = self.words[index + 1]
+        if self.words[index] ^ data != key:
+            return None
+        score = data & 0xFFFFFFFF
+        if score > MAX_STORED_SCORE:
+            score -= 1 << 32
+        return key, data >> 32 & 0xFF, data >> 40 & 3, score / SCORE_SCALE, decode_move(data >> 42)
+
+    def store(self, key: int, depth: int, bound: int, score: float, best_move: Move | None):
+        index = (key & self.mask) << 1
+        data = self.words[index + 1]
+        # Keep deeper result of the same position, always replace other positions
+        if self.words[index] ^ data == key and data >> 32 & 0xFF > depth:
+            return
+        score = round(max(-MAX_STORED_SCORE, min(MAX_STORED_SCORE, score * SCORE_SCALE)))
+        data = score & 0xFFFFFFFF | depth << 32 | bound << 40 | encode_move(best_move) << 42
+        self.words[index] = key ^ data
+        self.words[index + 1] = data
+
+    def clear(self):
+        self.shared_memory.buf[:] = bytes(self.size * 16)
+
+    def close(self):
+        self.words.release()
+        self.shared_memory.close()
+        if self.is_owner:
+            self.shared_memory.unlink()
@@ -0,0 +1,149 @@
+"""
+Texel tuning of the V0Evaluator piece values and position coefficients.
+Evaluation is linear in the parameters apart from the simplification bonus and the endgame cutoff,
+so each position is reduced to feature rows once and every epoch is a couple of matrix products.
+"""
+import numpy as np
+from chess import PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING, PIECE_TYPES, WHITE, BLACK, piece_name
+
+from engine.dataset import unpack_squares
+from engine.piece_square_tables import PIECE_VALUES, ENDGAME_FULLMOVE_NUMBER, COEFFICIENT_NAMES, COEFFICIENTS, piece_position_features
+
+# Pawn value stays 1, it is the unit of evaluation
+TUNED_PIECE_TYPES = (KNIGHT, BISHOP, ROOK, QUEEN)
+PARAMETER_NAMES = (*(piece_name(piece_type).upper() for piece_type in TUNED_PIECE_TYPES), *COEFFICIENT_NAMES)
+INITIAL_PARAMETERS = np.array([*(PIECE_VALUES[piece_type] for piece_type in TUNED_PIECE_TYPES), *COEFFICIENTS])
+CONSTANT = len(PARAMETER_NAMES)  # Feature column of the untuned piece values, its parameter is always 1
+CHUNK_SIZE = 8192  # Records decoded at once, their squares take 3 KB each as float32
+
+
+def build_basis() -> np.ndarray:
+    """Derivatives of the piece square tables by the parameters, indexed by [is_endgame][color][(piece_type - 1) * 64 + square]"""
+    basis = np.zeros((2, 2, 6 * 64, CONSTANT + 1), dtype=np.float32)
+    for is_endgame in (False, True):
+        for color in (BLACK, WHITE):
+            for piece_type in PIECE_TYPES:
+                for square in range(64):
+                    row = basis[int(is_endgame), int(color), (piece_type - 1) * 64 + square]
+                    if piece_type in TUNED_PIECE_TYPES:
+                        row[TUNED_PIECE_TYPES.index(piece_type)] = 1
+                    else:
+                        row[CONSTANT] = PIECE_VALUES[piece_type]
+                    row[len(TUNED_PIECE_TYPES):CONSTANT] = piece_position_features(piece_type, square, color, is_endgame)
+    return basis
+
+
+BASIS = build_basis()
+
+
+def extract_features(records: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """(white, black) feature matrices, the material score of a side is its matrix times the parameters and a 1"""
+    white = np.empty((len(records), CONSTANT + 1), dtype=np.float32)
+    black = np.empty((len(records), CONSTANT + 1), dtype=np.float32)
+    for start in range(0, len(records), CHUNK_SIZE):
+        chunk = records[start:start + CHUNK_SIZE]
+        squares = unpack_squares(chunk).astype(np.float32)
+        is_endgame = (chunk["fullmove_number"] > ENDGAME_FULLMOVE_NUMBER)[:, None]
+        for color, features in ((WHITE, white), (BLACK, black)):
+            middlegame = squares[:, int(color)] @ BASIS[0, int(color)]
+            endgame = squares[:, int(color)] @ BASIS[1, int(color)]
+            features[start:start + len(chunk)] = np.where(is_endgame, endgame, middlegame)
+    return white, black
+
+
+def has_cutoff(white_material: np.ndarray, black_material: np.ndarray) -> np.ndarray:
+    """Positions with the endgame cutoff of V0Evaluator._evaluate_material, their evaluation doesn't depend on the parameters"""
+    worse_material = np.minimum(white_material, black_material)
+    better_material = np.maximum(white_material, black_material)
+    return ((worse_material == 0) & (better_material >= 5)) | ((0 < worse_material) & (worse_material < 2) & (better_material >= 10))
+
+
+class TexelTuner:
+    """Minimizes the mean squared error between the game results and sigmoid of the evaluations.
+    Check penalty and noise of V0Evaluator are left out, positions with the endgame cutoff are skipped."""
+    def __init__(self, datasets: list[np.ndarray], score_weight: float = 0.):
+        # Only the features are kept in memory, the memory-mapped records are read once chunk by chunk
+        features = [extract_features(records) for records in datasets]
+        white = np.concatenate([white for white, _ in features])
+        black = np.concatenate([black for _, black in features])
+        records = np.concatenate([records[["result", "score"]] for records in datasets])
+        parameters = np.append(INITIAL_PARAMETERS, 1).astype(np.float32)
+        keep = ~has_cutoff(white @ parameters, black @ parameters)
+        self.difference = white[keep] - black[keep]
+        self.total = white[keep] + black[keep]
+        self.results = records["result"][keep] / 2.
+        self.scores = records["score"][keep] / 100.
+        # Part of the targets taken from the search score instead of the game result
+        self.score_weight = score_weight
+        self.scale = 1.
+        self.targets = self.results
+        self.parameters = INITIAL_PARAMETERS.copy()
+
+    def __len__(self):
+        return len(self.results)
+
+    def evaluate(self, parameters: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(evaluations, derivative of the evaluations by the total material) from white perspective"""
+        parameters = np.append(parameters, 1).astype(np.float32)
+        difference = self.difference @ parameters
+        # Bonus for simplification, same as in V0Evaluator._evaluate_material
+        simplification = np.where(np.abs(difference) > 1.95, np.sign(difference) / 78., 0.)
+        return difference + simplification * (self.total @ parameters), simplification
+
+    def loss(self, parameters: np.ndarray, scale: float, targets: np.ndarray) -> float:
+        evaluations, _ = self.evaluate(parameters)
+        return float(np.mean((sigmoid(scale * evaluations) - targets) ** 2))
+
+    def fit_scale(self, low: float = 0.01, high: float = 10., iterations: int = 50) -> float:
+        """Sigmoid scale which fits the game results with the current parameters best, the loss is unimodal in it.
+        Search scores are mapped to the targets with the same scale."""
+        for _ in range(iterations):
+            left = low + (high - low) / 3
+            right = high - (high - low) / 3
+            if self.loss(self.parameters, left, self.results) < self.loss(self.parameters, right, self.results):
+                high = right
+            else:
+                low = left
+        self.scale = (low + high) / 2
+        self.targets = (1 - self.score_weight) * self.results + self.score_weight * sigmoid(self.scale * self.scores)
+        return self.scale
+
+    def gradient(self, parameters: np.ndarray) -> tuple[float, np.ndarray]:
+        """(loss, gradient of the loss by the parameters)"""
+        evaluations, simplification = self.evaluate(parameters)
+        predictions = sigmoid(self.scale * evaluations)
+        errors = predictions - self.targets
+        weights = (2 * errors * self.scale * predictions * (1 - predictions) / len(self)).astype(np.float32)
+        gradient = self.difference.T @ weights + self.total.T @ (weights * simplification).astype(np.float32)
+        return float(np.mean(errors ** 2)), gradient[:CONSTANT]
+
+    def tune(self, epochs: int = 1000, learning_rate: float = 0.002, callback=None) -> np.ndarray:
+        """Full batch gradient descent with Adam, callback is called with (epoch, loss) after each epoch"""
+        beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+        momentum = np.zeros(CONSTANT)
+        velocity = np.zeros(CONSTANT)
+        for epoch in range(1, epochs + 1):
+            loss, gradient = self.gradient(self.parameters)
+            momentum = beta1 * momentum + (1 - beta1) * gradient
+            velocity = beta2 * velocity + (1 - beta2) * gradient ** 2
+            step = momentum / (1 - beta1 ** epoch) / (np.sqrt(velocity / (1 - beta2 ** epoch)) + epsilon)
+            self.parameters = self.parameters - learning_rate * step
+            if callback is not None:
+                callback(epoch, loss)
+        return self.parameters
+
+
+def sigmoid(values: np.ndarray) -> np.ndarray:
+    # Clipped to avoid overflow of exp, the sigmoid is flat there anyway
+    return 1 / (1 + np.exp(-np.clip(values, -50, 50)))
+
+
+def format_parameters(parameters: np.ndarray) -> str:
+    """Parameters as the constants of engine/piece_square_tables.py"""
+    values = dict(zip(PARAMETER_NAMES, parameters.tolist()))
+    piece_values = {PAWN: PIECE_VALUES[PAWN], **{piece_type: round(values[piece_name(piece_type).upper()], 3) for piece_type in TUNED_PIECE_TYPES}, KING: PIECE_VALUES[KING]}
+    lines = ["PIECE_VALUES = {"]
+    lines += [f"    {piece_name(piece_type).upper()}: {value}," for piece_type, value in piece_values.items()]
+    lines.append("}")
+    lines += [f"{name} = {round(values[name], 4)}" for name in COEFFICIENT_NAMES]
+    return "\n".join(lines)
@@ -0,0 +1,168 @@
+import sys
+import threading
+
+import chess
+from chess.engine import Limit
+
+from engine.base import BaseEngine
+from engine.time_manager import TimeManager
+
+ENGINE_NAME = "Basilisk"
+ENGINE_AUTHOR = "Jakub Sztyma"
+GO_PARAMETERS = ("wtime", "btime", "winc", "binc", "movestogo", "depth", "nodes", "mate", "movetime")
+GO_FLAGS = ("searchmoves", "ponder", "infinite")
+
+
+def format_info(info: dict, turn: bool) -> str:
+    score = info["score"].pov(turn)
+    if score.is_mate():
+        score_part = f"mate {score.mate()}"
+    else:
+        score_part = f"cp {score.score()}"
+    pv = " ".join(move.uci() for move in info["pv"])
+    return (
+        f"info depth {info['depth']} score {score_part} nodes {info['nodes']} "
+        f"nps {info['nps']} time {int(info['time'] * 1000)} pv {pv}"
+    )
+
+
+def parse_go(tokens: list) -> tuple[Limit, bool, bool]:
+    """Limit and (infinite, ponder) flags from arguments of the go command"""
+    arguments = {}
+    infinite = ponder = False
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == "infinite":
+            infinite = True
+        elif token == "ponder":
+            ponder = True
+        elif token == "searchmoves":
+            # Restricting root moves is not supported, the moves are skipped
+            while i + 1 < len(tokens) and tokens[i + 1] not in GO_PARAMETERS + GO_FLAGS:
+                i += 1
+        elif token in GO_PARAMETERS and i + 1 < len(tokens) and tokens[i + 1].lstrip("-").isdigit():
+            arguments[token] = int(tokens[i + 1])
+            i += 1
+        # Unknown and malformed tokens are ignored, the front-end must keep running
+        i += 1
+
+    def seconds(name):
+        return arguments[name] / 1000 if name in arguments else None
+
+    limit = Limit(
+        time=seconds("movetime"),
+        depth=arguments.get("depth"),
+        white_clock=seconds("wtime"),
+        black_clock=seconds("btime"),
+        white_inc=seconds("winc"),
+        black_inc=seconds("binc"),
+        remaining_moves=arguments.get("movestogo"),
+    )
+    return limit, infinite, ponder
+
+
+class UciFrontend:
+    """UCI protocol around an engine. Commands are read on the calling thread and the search
+    runs in a separate thread, so stop and ponderhit are handled while the engine is searching."""
+    def __init__(self, engine: BaseEngine, input_stream=sys.stdin, output_stream=sys.stdout):
+        self.engine = engine
+        self.input_stream = input_stream
+        self.output_stream = output_stream
+        self.output_lock = threading.Lock()
+        self.board = chess.Board()
+        self.search_thread = None
+        self.search_limit = None
+        # In infinite and ponder mode bestmove is sent only after stop or ponderhit
+        self.can_send_best_move = threading.Event()
+
+    def send(self, line: str):
+        with self.output_lock:
+            self.output_stream.write(line + "\n")
+            self.output_stream.flush()
+
+    def run(self):
+        for line in self.input_stream:
+            if not self.handle(line.strip()):
+                break
+        self.stop()
+
+    def handle(self, command: str) -> bool:
+        """Handle one command, False when the front-end should quit"""
+        tokens = command.split()
+        if not tokens:
+            return True
+
+        match tokens[0]:
+            case "uci":
+                self.send(f"id name {ENGINE_NAME}")
+                self.send(f"id author {ENGINE_AUTHOR}")
+                self.send("uciok")
+            case "isready":
+                self.send("readyok")
+            case "ucinewgame":
+                self.stop()
+                if hasattr(self.engine, "transposition_table"):
+                    self.engine.transposition_table.clear()
+            case "position":
+                self.stop()
+                self.set_position(tokens[1:])
+            case "go":
+                self.stop()
+                self.go(tokens[1:])
+            case "stop":
+                self.stop()
+            case "ponderhit":
+                self.ponderhit()
+            case "quit":
+                return False
+        return True
+
+    def set_position(self, tokens: list):
+        if tokens[0] == "startpos":
+            self.board = chess.Board()
+            tokens = tokens[1:]
+        elif tokens[0] == "fen":
+            fen_end = tokens.index("moves") if "moves" in tokens else len(tokens)
+            self.board = chess.Board(" ".join(tokens[1:fen_end]))
+            tokens = tokens[fen_end:]
+        if tokens and tokens[0] == "moves":
+            for move in tokens[1:]:
+                self.board.push_uci(move)
+
+    def go(self, tokens: list):
+        limit, infinite, ponder = parse_go(tokens)
+        self.search_limit = limit
+        if infinite or ponder:
+            self.can_send_best_move.clear()
+        else:
+            self.can_send_best_move.set()
+        # Ponder search runs without time limit until ponderhit
+        search_limit = Limit(depth=limit.depth) if ponder else limit
+
+        board = self.board.copy()
+        self.engine.stop_requested = False
+        self.engine.info_handler = lambda info: self.send(format_info(info, board.turn))
+        self.search_thread = threading.Thread(target=self.search, args=(board, search_limit), daemon=True)
+        self.search_thread.start()
+
+    def search(self, board: chess.Board, limit: Limit):
+        result = self.engine.play(board, limit)
+        self.can_send_best_move.wait()
+        if result.ponder is not None:
+            self.send(f"bestmove {result.move.uci()} ponder {result.ponder.uci()}")
+        else:
+            self.send(f"bestmove {result.move.uci()}")
+
+    def ponderhit(self):
+        # Opponent played the expected move, continue the same search with normal time limit
+        self.engine.time_manager = TimeManager(self.board, self.search_limit)
+        self.can_send_best_move.set()
+
+    def stop(self):
+        if self.search_thread is None:
+            return
+        self.engine.stop_requested = True
+        self.can_send_best_move.set()
+        self.search_thread.join()
+        self.search_thread = None
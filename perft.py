@@ -0,0 +1,90 @@
+"""
+Perft of ExtendedBoard: counts leaf nodes of the legal move tree and compares them with known results.
+With --check the incrementally updated pieces map, Zobrist hashes and scores are verified at every node.
+"""
+import argparse
+import time
+
+from chess.polyglot import zobrist_hash
+
+from engine.board import ExtendedBoard
+
+# Name -> (FEN, leaf nodes for depth 1, 2, ...)
+POSITIONS = {
+    "startpos": ("rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1", [20, 400, 8902, 197281, 4865609]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862, 4085603]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238, 674624]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", [6, 264, 9467, 422333]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", [44, 1486, 62379, 2103487]),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10", [46, 2079, 89890, 3894594]),
+}
+
+
+class PerftError(Exception):
+    pass
+
+
+def check_board(board: ExtendedBoard):
+    """Incremental state of the board must be the same as computed from scratch"""
+    pieces_map = {square: piece.piece_type for square, piece in board.piece_map().items()}
+    if board.pieces_map != pieces_map:
+        raise PerftError(f"pieces map mismatch in {board.fen()} after {board.move_stack}")
+    if board.zobrist_hash != zobrist_hash(board):
+        raise PerftError(f"Zobrist hash mismatch in {board.fen()} after {board.move_stack}")
+    if board.pawn_hash != board.compute_pawn_hash():
+        raise PerftError(f"pawn hash mismatch in {board.fen()} after {board.move_stack}")
+    scores = (board.white_score, board.black_score, board.white_endgame_score, board.black_endgame_score)
+    if any(abs(score - expected) > 1e-6 for score, expected in zip(scores, board.compute_scores())):
+        raise PerftError(f"score mismatch in {board.fen()} after {board.move_stack}")
+
+
+def perft(board: ExtendedBoard, depth: int, check: bool = False) -> tuple[int, int]:
+    """(leaf nodes, pushed moves), leaves are pushed too so that make/unmake is measured"""
+    if check:
+        check_board(board)
+    if depth == 0:
+        return 1, 0
+    nodes = 0
+    pushes = 0
+    for move in board.generate_legal_moves():
+        board.push(move)
+        child_nodes, child_pushes = perft(board, depth - 1, check)
+        board.pop()
+        nodes += child_nodes
+        pushes += child_pushes + 1
+    return nodes, pushes
+
+
+def divide(board: ExtendedBoard, depth: int, check: bool = False) -> dict:
+    """Leaf nodes for each root move, to find the move with a wrong count"""
+    result = {}
+    for move in board.generate_legal_moves():
+        board.push(move)
+        result[move.uci()] = perft(board, depth - 1, check)[0]
+        board.pop()
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Perft of ExtendedBoard push/pop")
+    parser.add_argument("depth", type=int, nargs="?", default=3)
+    parser.add_argument("positions", nargs="*", help=f"names from {', '.join(POSITIONS)} or FENs, all named positions by default")
+    parser.add_argument("--divide", action="store_true", help="leaf nodes for each root move")
+    parser.add_argument("--check", action="store_true", help="verify pieces map, hashes and scores at every node (slow)")
+    args = parser.parse_args()
+
+    for position in args.positions or list(POSITIONS):
+        fen, expected_nodes = POSITIONS.get(position, (position, []))
+        board = ExtendedBoard(fen)
+        if args.divide:
+            for move, nodes in divide(board, args.depth, args.check).items():
+                print(f"{move}: {nodes}")
+
+        start = time.perf_counter()
+        nodes, pushes = perft(board, args.depth, args.check)
+        elapsed = time.perf_counter() - start
+        if args.depth <= len(expected_nodes):
+            status = "OK" if nodes == expected_nodes[args.depth - 1] else f"MISMATCH, expected {expected_nodes[args.depth - 1]}"
+        else:
+            status = "unknown"
+        print(f"{position}: depth {args.depth}, nodes {nodes} {status}, time {elapsed:.2f} s, moves/s {int(pushes / elapsed)}")
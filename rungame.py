@@ -1,10 +1,11 @@
 """
 Example of use of GameSession and Engine to make Stockfish play itself.
 """
+import json
 import os
 import random
 from copy import deepcopy
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict
 from multiprocessing import Pool
 
 import chess
@@ -16,8 +17,11 @@ from engine.alpha_beta import AlphaBetaEngine
 from engine.base import RandomEngine
 from engine.basilisk import BasiliskEngine
 from engine.board import ExtendedBoard
+from engine.book import OpeningBook
 from engine.minmax import MinMaxEngine
-from engine.evaluators import BasicMaterialEvaluator, V0Evaluator
+from engine.evaluators import BasicMaterialEvaluator, V0Evaluator, CachedEvaluator
+from engine.sprt import sprt
+from engine.stats import StatsCollector, aggregate
 
 
 @dataclass
@@ -27,21 +31,29 @@ class GameResult:
     elapsed: float
     visited_nodes: int
     depth_sum: int
+    pgn: str = ""
 
 # Create a new chess board
 class Game:
     def __init__(self, white, black):
         self.white = white
         self.black = black
+        self.positions = []  # (board, score of its search or None) before each move of the last game
 
-    def play(self, time_limit=0.3, move_limit: int=None):
+    def play(self, time_limit=0.3, move_limit: int=None, clock: tuple[float, float]=None):
+        """Fixed time per move, or a game clock of (base seconds, increment seconds) when given"""
         random.seed(time.time() + os.getpid()) # Necessary to avoid duplicating games in processes
         game = chess.pgn.Game()
         game.headers["White"] = str(self.white)
         game.headers["Black"] = str(self.black)
         node = game
+        time_result = None
+        self.positions = []
 
         board = chess.Board()
+        if clock is not None:
+            base, increment = clock
+            clocks = {chess.WHITE: base, chess.BLACK: base}
 
         start = time.time()
         while board.result() == "*":
@@ -54,7 +66,25 @@ class Game:
             else:
                 engine = self.black
 
-            best_move = engine.play(deepcopy(board), chess.engine.Limit(time=time_limit)).move
+            if clock is None:
+                limit = chess.engine.Limit(time=time_limit)
+            else:
+                limit = chess.engine.Limit(
+                    white_clock=clocks[chess.WHITE], black_clock=clocks[chess.BLACK],
+                    white_inc=increment, black_inc=increment,
+                )
+            move_start = time.time()
+            play_result = engine.play(deepcopy(board), limit)
+            best_move = play_result.move
+            self.positions.append((board.copy(stack=False), play_result.info.get("score")))
+            if clock is not None:
+                clocks[board.turn] -= time.time() - move_start
+                if clocks[board.turn] < 0:
+                    # Lost on time, unless the opponent can't mate
+                    game.headers["Termination"] = "time forfeit"
+                    time_result = "1/2-1/2" if board.has_insufficient_material(not board.turn) else ("0-1" if board.turn else "1-0")
+                    break
+                clocks[board.turn] += increment
             board.push(best_move)
             node = node.add_variation(best_move)  # Add game node
 
@@ -66,10 +96,11 @@ class Game:
         self.white.quit()
         self.black.quit()
 
+        game.headers["Result"] = time_result or board.result(claim_draw=True)
         print(game) # PGN
 
         elapsed = time.time() - start
-        match board.result():
+        match time_result or board.result():
             case "1-0":
                 result =  1
             case "0-1":
@@ -79,10 +110,43 @@ class Game:
 
         visited_nodes = self.white.visited_nodes
         depth_sum = sum(self.white.achieved_depths)
-        return GameResult(result, board.fullmove_number, elapsed, visited_nodes, depth_sum)
+        return GameResult(result, board.fullmove_number, elapsed, visited_nodes, depth_sum, str(game))
+
+OPENING_BOOK_PATH = os.environ.get("OPENING_BOOK")  # Polyglot .bin book for BasiliskEngine, optional
+RESULTS_PATH = os.environ.get("RESULTS_PATH", "results.jsonl")  # Finished games, an interrupted match resumes from it
+STATS_PATH = os.environ.get("STATS_PATH")  # JSON lines with search stats of BasiliskEngine, optional
+
+def play_game(_game_index=None):
+    book = OpeningBook(OPENING_BOOK_PATH) if OPENING_BOOK_PATH else None
+    stats_collector = StatsCollector(STATS_PATH) if STATS_PATH else None
+    return Game(BasiliskEngine(CachedEvaluator(V0Evaluator()), book=book, stats_collector=stats_collector), AlphaBetaEngine(BasicMaterialEvaluator())).play()
+
+
+def load_results(path: str) -> list[GameResult]:
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        lines = file.readlines()
+    if lines and not lines[-1].endswith("\n"):
+        # Last line cut off by a crash, drop it so that appended results start on a new line
+        lines.pop()
+        with open(path, "w") as file:
+            file.writelines(lines)
+    return [GameResult(**json.loads(line)) for line in lines]
 
-def play_game():
-    return Game(BasiliskEngine(V0Evaluator()), AlphaBetaEngine(BasicMaterialEvaluator())).play()
+
+def append_result(path: str, game_result: GameResult):
+    with open(path, "a") as file:
+        file.write(json.dumps(asdict(game_result)) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def count_outcomes(game_results: list[GameResult]) -> tuple:
+    # (wins, draws, losses) of white
+    wins = sum(1 for gr in game_results if gr.result == 1)
+    losses = sum(1 for gr in game_results if gr.result == 0)
+    return wins, len(game_results) - wins - losses, losses
 
 if __name__ == '__main__':
     # Provide the path to the Stockfish engine
@@ -91,17 +155,26 @@ if __name__ == '__main__':
     # engine_path = "/opt/homebrew/bin/stockfish"  # Update this path
     # stockfish = chess.engine.SimpleEngine.popen_uci(engine_path)
 
-    GAMES_COUNT = 100
-    white_result = 0
-
-
-    with Pool(10) as pool:
-        async_results = [
-            pool.apply_async(play_game, ()) for _ in range(GAMES_COUNT)
-        ]
-        game_results = [r.get() for r in async_results]
-        for i, gr in enumerate(game_results):
-            print(f"Game {i} result: {gr.result}")
+    GAMES_COUNT = 100  # Upper bound, SPRT usually decides sooner
+    SPRT_ELO0, SPRT_ELO1 = 0, 10
+
+    game_results = load_results(RESULTS_PATH)
+    decision, llr = sprt(*count_outcomes(game_results), SPRT_ELO0, SPRT_ELO1)
+    if game_results:
+        print(f"Resuming after {len(game_results)} games, LLR: {llr:.2f}")
+
+    if decision is None and len(game_results) < GAMES_COUNT:
+        with Pool(10) as pool:
+            # Results are handled in order of finishing, leaving the block terminates games still running
+            for gr in pool.imap_unordered(play_game, range(GAMES_COUNT - len(game_results))):
+                append_result(RESULTS_PATH, gr)
+                game_results.append(gr)
+                decision, llr = sprt(*count_outcomes(game_results), SPRT_ELO0, SPRT_ELO1)
+                print(f"Game {len(game_results)} result: {gr.result}, LLR: {llr:.2f}")
+                if decision is not None:
+                    break
+    if decision is not None:
+        print(f"SPRT [{SPRT_ELO0}, {SPRT_ELO1}] accepted {decision} after {len(game_results)} games")
 
     white_result = sum(gr.result for gr in game_results)
     fullmove_number = sum(gr.fullmove_number for gr in game_results)
@@ -116,10 +189,12 @@ if __name__ == '__main__':
 
     print(
           f"\n"
-          f"Match result: {white_result} : {GAMES_COUNT - white_result}, "
+          f"Match result: {white_result} : {len(game_results) - white_result}, "
           f"Elapsed: {elapsed}. "
           f"Fullmoves: {fullmove_number}. "
           f"Time per move: {elapsed / fullmove_number}. "
           f"Nodes per move: {visited_nodes / fullmove_number}. "
           f"Average depth: {depth_sum / fullmove_number}. "
       )
+    if STATS_PATH:
+        print(f"Search stats: {json.dumps(aggregate(STATS_PATH))}")
@@ -0,0 +1,58 @@
+"""
+Self-play of BasiliskEngine writing labeled positions for tuning, see engine/dataset.py for the record format.
+Every worker process appends to its own shard in the output directory: python selfplay.py data --games 1000
+"""
+import argparse
+import os
+from multiprocessing import Pool
+
+from engine.basilisk import BasiliskEngine
+from engine.book import OpeningBook
+from engine.dataset import DatasetWriter, MAX_SCORE, pack_board
+from engine.evaluators import V0Evaluator, CachedEvaluator
+from rungame import Game, OPENING_BOOK_PATH
+
+MOVE_LIMIT = 200
+
+writer = None  # DatasetWriter of the worker process
+
+
+def init_worker(output: str):
+    global writer
+    writer = DatasetWriter(os.path.join(output, f"selfplay-{os.getpid()}.bin"))
+
+
+def play_selfplay_game(time_limit: float) -> tuple[float, int]:
+    """(result, written positions) of one game"""
+    book = OpeningBook(OPENING_BOOK_PATH) if OPENING_BOOK_PATH else None
+    game = Game(
+        BasiliskEngine(CachedEvaluator(V0Evaluator()), book=book),
+        BasiliskEngine(CachedEvaluator(V0Evaluator()), book=book),
+    )
+    game_result = game.play(time_limit=time_limit, move_limit=MOVE_LIMIT)
+    positions = 0
+    for board, score in game.positions:
+        # Book and tablebase moves have no score
+        if score is None:
+            continue
+        writer.write(pack_board(board, score.white().score(mate_score=MAX_SCORE), game_result.result))
+        positions += 1
+    # Whole game at once, a terminated worker loses at most the game in progress
+    writer.flush()
+    return game_result.result, positions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Self-play games written as binary position records")
+    parser.add_argument("output", help="directory of the shards, created if missing")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=10)
+    parser.add_argument("--time", type=float, default=0.1, help="seconds per move")
+    args = parser.parse_args()
+
+    os.makedirs(args.output, exist_ok=True)
+    total_positions = 0
+    with Pool(args.processes, initializer=init_worker, initargs=(args.output,)) as pool:
+        for game_index, (result, positions) in enumerate(pool.imap_unordered(play_selfplay_game, [args.time] * args.games), 1):
+            total_positions += positions
+            print(f"Game {game_index} result: {result}, positions: {positions}, total positions: {total_positions}")
@@ -0,0 +1,22 @@
+import random
+
+import pytest
+from chess import Board
+
+
+@pytest.fixture
+def random_boards():
+    """Factory of boards reached by random games, the same for every call with the same count"""
+    def make_boards(count: int) -> list:
+        rng = random.Random(1)
+        boards = []
+        for _ in range(count):
+            board = Board()
+            for _ in range(rng.randint(0, 150)):
+                moves = list(board.legal_moves)
+                if not moves:
+                    break
+                board.push(rng.choice(moves))
+            boards.append(Board(board.fen()))
+        return boards
+    return make_boards
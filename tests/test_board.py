@@ -0,0 +1,65 @@
+import pytest
+from chess import Move
+from chess.polyglot import zobrist_hash
+
+from engine.board import ExtendedBoard
+from perft import POSITIONS, perft
+
+FENS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "8/8/2K5/pP6/8/8/8/7k w - a6 0 2",
+]
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_zobrist_hash(fen: str):
+    board = ExtendedBoard(fen)
+    original_hash = board.zobrist_hash
+    assert original_hash == zobrist_hash(board)
+
+    for move in [*board.legal_moves, Move.null()]:
+        with board.apply(move):
+            assert board.zobrist_hash == zobrist_hash(board)
+            for reply in board.legal_moves:
+                with board.apply(reply):
+                    assert board.zobrist_hash == zobrist_hash(board)
+
+        assert board.zobrist_hash == original_hash
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_incremental_scores(fen: str):
+    board = ExtendedBoard(fen)
+    original_scores = board.compute_scores()
+
+    for move in board.legal_moves:
+        with board.apply(move):
+            for reply in board.legal_moves:
+                with board.apply(reply):
+                    scores = (board.white_score, board.black_score, board.white_endgame_score, board.black_endgame_score)
+                    assert scores == pytest.approx(board.compute_scores())
+
+        assert (board.white_score, board.black_score, board.white_endgame_score, board.black_endgame_score) == original_scores
+
+
+@pytest.mark.parametrize("name", list(POSITIONS))
+def test_perft(name: str):
+    fen, expected_nodes = POSITIONS[name]
+    nodes, _ = perft(ExtendedBoard(fen), 2, check=True)
+    assert nodes == expected_nodes[1]
+
+
+def test_is_repeated():
+    board = ExtendedBoard()
+    for move in ["g1f3", "g8f6", "f3g1", "f6g8", "g1f3", "e7e5", "f3g1", "e5e4", "g1f3", "f8e7"]:
+        board.push_uci(move)
+        assert board.is_repeated() == board.is_repetition(2)
+        assert board.check_game_over() == (0 if board.is_repetition(2) else None)
+
+
+def test_check_draw_minor_pieces():
+    assert ExtendedBoard("7k/8/6KN/8/5B2/8/8/8 w - - 0 1").check_draw()
+    # Mated by minor pieces, not a draw
+    assert not ExtendedBoard("7k/8/6KN/4B3/8/8/8/8 b - - 1 1").check_draw()
@@ -0,0 +1,30 @@
+import struct
+
+from chess import Move
+from chess.engine import Limit
+
+from engine.basilisk import BasiliskEngine
+from engine.board import ExtendedBoard
+from engine.book import OpeningBook, BEST
+from engine.evaluators import V0Evaluator
+
+
+def write_book(path, board: ExtendedBoard, moves: list):
+    # Polyglot entries: key, move (from square << 6 | to square), weight, learn
+    entries = [(board.zobrist_hash, move.from_square << 6 | move.to_square, weight, 0) for move, weight in moves]
+    with open(path, "wb") as file:
+        for entry in sorted(entries):
+            file.write(struct.pack(">QHHI", *entry))
+
+
+def test_book_move(tmp_path):
+    board = ExtendedBoard()
+    write_book(tmp_path / "book.bin", board, [(Move.from_uci("d2d4"), 5), (Move.from_uci("e2e4"), 10)])
+    book = OpeningBook(str(tmp_path / "book.bin"), selection=BEST)
+
+    assert book.probe(board) == Move.from_uci("e2e4")
+    assert BasiliskEngine(V0Evaluator(), book=book).play(board, Limit(time=0.5)).move == Move.from_uci("e2e4")
+
+    with board.apply(Move.from_uci("e2e4")):
+        assert book.probe(board) is None
+    book.close()
@@ -0,0 +1,33 @@
+import numpy as np
+
+from engine import evaluators
+from engine.dataset import DatasetWriter, RECORD_DTYPE, load_dataset, pack_board, unpack_board, unpack_squares
+
+
+def test_pack_board(random_boards):
+    boards = random_boards(50)
+    records = np.array([pack_board(board, index - 25, index % 3 / 2) for index, board in enumerate(boards)], dtype=RECORD_DTYPE)
+    for index, (board, record) in enumerate(zip(boards, records)):
+        # Halfmove clock is not stored
+        assert unpack_board(record).fen().split()[:4] == board.fen().split()[:4]
+        assert unpack_board(record).fullmove_number == board.fullmove_number
+        assert (record["score"], record["result"]) == (index - 25, index % 3)
+    assert np.array_equal(unpack_squares(records), evaluators.unpack_squares(evaluators.pack_bitboards(boards)))
+
+
+def test_dataset_writer(tmp_path, random_boards):
+    path = tmp_path / "shard.bin"
+    boards = random_boards(10)
+    with DatasetWriter(path, buffer_size=4) as writer:
+        for board in boards:
+            writer.write(pack_board(board, 0, 1))
+    # Record cut off by a crash
+    with open(path, "ab") as file:
+        file.write(b"\0" * 5)
+    assert [unpack_board(record).board_fen() for record in load_dataset(path)] == [board.board_fen() for board in boards]
+
+    with DatasetWriter(path) as writer:
+        writer.write(pack_board(boards[0], 0, 1))
+    records = load_dataset(path)
+    assert len(records) == 11
+    assert unpack_board(records[-1]).board_fen() == boards[0].board_fen()
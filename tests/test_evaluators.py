@@ -0,0 +1,66 @@
+import pytest
+from chess import Board
+
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator, V1Evaluator, BasicMaterialEvaluator, CachedEvaluator
+from engine.pawn_structure import evaluate_pawn_structure, PASSED_PAWN_BONUS, ISOLATED_PAWN_PENALTY, DOUBLED_PAWN_PENALTY
+
+
+@pytest.mark.parametrize("evaluator", [V0Evaluator(), V1Evaluator(), BasicMaterialEvaluator()])
+def test_evaluate_many(evaluator, random_boards):
+    boards = random_boards(50)
+    evaluations = evaluator.evaluate_many(boards)
+    assert evaluations.shape == (len(boards),)
+    for board, evaluation in zip(boards, evaluations):
+        # Noise depends only on the position, only the summation order differs
+        assert evaluation == pytest.approx(evaluator.evaluate(ExtendedBoard(board.fen())), abs=1e-9)
+
+
+def test_cached_evaluator():
+    evaluator = V0Evaluator()
+    cached_evaluator = CachedEvaluator(evaluator, size_bits=8)
+    board = ExtendedBoard()
+    evaluation = cached_evaluator.evaluate(board)
+    # Noise depends only on the position
+    assert evaluation == evaluator.evaluate(board)
+    assert cached_evaluator.evaluate(board) == evaluation
+    assert (cached_evaluator.hits, cached_evaluator.misses) == (1, 1)
+
+    with board.apply(next(iter(board.legal_moves))):
+        assert cached_evaluator.evaluate(board) == evaluator.evaluate(board)
+    assert (cached_evaluator.hits, cached_evaluator.misses) == (1, 2)
+
+
+def test_cached_evaluator_endgame():
+    evaluator = V0Evaluator()
+    cached_evaluator = CachedEvaluator(evaluator)
+    middlegame_board = ExtendedBoard("4k3/8/8/8/8/2N5/8/6K1 w - - 0 60")
+    endgame_board = ExtendedBoard("4k3/8/8/8/8/2N5/8/6K1 w - - 0 61")
+    assert middlegame_board.zobrist_hash == endgame_board.zobrist_hash
+    # Same position after the endgame move is evaluated with other tables, a cached middlegame score must not be used
+    assert cached_evaluator.evaluate(middlegame_board) == evaluator.evaluate(middlegame_board)
+    assert cached_evaluator.evaluate(endgame_board) == evaluator.evaluate(endgame_board) != evaluator.evaluate(middlegame_board)
+
+
+def test_evaluate_pawn_structure():
+    board = Board("4k3/8/8/8/8/8/PPPPPPPP/4K3 w - - 0 1")
+    white_pawns = board.pawns & board.occupied_co[True]
+    assert evaluate_pawn_structure(white_pawns, 0) == pytest.approx(8 * PASSED_PAWN_BONUS[1])
+    # Doubled and isolated pawns on the a file, no pawn is passed and the black one is isolated
+    board = Board("4k3/1p6/8/8/8/P7/P7/4K3 w - - 0 1")
+    evaluation = evaluate_pawn_structure(board.pawns & board.occupied_co[True], board.pawns & board.occupied_co[False])
+    expected = -DOUBLED_PAWN_PENALTY - 2 * ISOLATED_PAWN_PENALTY + ISOLATED_PAWN_PENALTY
+    assert evaluation == pytest.approx(expected)
+
+
+def test_pawn_hash_table():
+    evaluator = V1Evaluator()
+    board = ExtendedBoard()
+    evaluation = evaluator.evaluate(board)
+    with board.apply(board.parse_uci("g1f3")):
+        evaluator.evaluate(board)
+    assert (evaluator.pawn_table.hits, evaluator.pawn_table.misses) == (1, 1)
+    assert evaluator.evaluate(board) == evaluation
+    with board.apply(board.parse_uci("e2e4")):
+        evaluator.evaluate(board)
+    assert (evaluator.pawn_table.hits, evaluator.pawn_table.misses) == (2, 2)
@@ -8,7 +8,7 @@ from engine.board import ExtendedBoard
 from engine.evaluators import V0Evaluator
 
 
-@pytest.mark.parametrize("fen, expected_response", [
+FEN_RESPONSES = [
     # Mate in 1
     ("4k3/1R4p1/3KP2p/p7/8/6r1/PP6/8 w - - 1 2", "b7b8"),
     ("2K5/k7/8/8/1Q6/8/8/N7 w - - 105 195", ("b4b7", "b4a5")),
@@ -28,8 +28,10 @@ from engine.evaluators import V0Evaluator
     ("r5k1/p4ppr/2n5/1N4p1/4P3/3PQPPb/PqP4P/R3R1K1 w - - 0 25", ("a1b1", "a2a4", "b5c7", "b5d6")),
     # Tactical
     ("r1b1kb1r/3ppqpp/np6/1B2B3/P2PN3/1Q2P2P/8/2R1K1R1 w q - 0 27", ("c1c8", "b5c4", "b3f7")),
+]
 
-])
+
+@pytest.mark.parametrize("fen, expected_response", FEN_RESPONSES)
 def test_fen_response(fen: str, expected_response: str):
     board = ExtendedBoard(fen)
 
@@ -55,3 +57,20 @@ def test_board_apply(fen:str, move: str):
         pass
 
     assert board.pieces_map == original_pieces
+
+
+@pytest.mark.parametrize("fen, hash_move, killer", [
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", "e5f7", "e1g1"),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", "d7c8q", "a2a3"),
+    ("8/8/2K5/pP6/8/8/8/7k w - a6 0 2", "b5a6", "c6c7"),
+    ("r1bqk2r/1pppn1b1/p4np1/2Q2p1p/4pP2/P1P1P2N/RP1PK1PP/1NB2B1R b kq - 3 13", "h8h7", "e8g8"),
+])
+def test_staged_move_generation(fen: str, hash_move: str, killer: str):
+    engine = BasiliskEngine(V0Evaluator())
+    engine.board = ExtendedBoard(fen)
+    engine.killers[0] = [Move.from_uci(killer), None]
+
+    moves = list(engine.get_legal_moves(Move.from_uci(hash_move), ply=0))
+
+    assert moves[0] == Move.from_uci(hash_move)
+    assert sorted(moves, key=str) == sorted(engine.board.legal_moves, key=str)
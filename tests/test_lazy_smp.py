@@ -0,0 +1,39 @@
+from chess import Move
+from chess.engine import Limit, Mate
+
+from engine import lazy_smp
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator
+from engine.lazy_smp import LazySMPEngine
+
+MATE_IN_ONE_FEN = "4k3/1R4p1/3KP2p/p7/8/6r1/PP6/8 w - - 1 2"
+
+
+def deep_helper(fen: str, depth: int | None, helper_index: int):
+    # Helper which always completes a deeper iteration than the main search
+    return 10, [Move.from_uci("b7b8"), Move.from_uci("g3g8")], 1.5, 100
+
+
+def test_lazy_smp():
+    engine = LazySMPEngine(V0Evaluator(), processes=2, size_bits=12)
+    try:
+        play_result = engine.play(ExtendedBoard(MATE_IN_ONE_FEN), Limit(depth=3))
+    finally:
+        engine.quit()
+    assert play_result.move == Move.from_uci("b7b8")
+    assert play_result.info["score"].white() == Mate(1)
+    assert play_result.info["pv"][0] == play_result.move
+
+
+def test_lazy_smp_helper_result(monkeypatch):
+    monkeypatch.setattr(lazy_smp, "_search_helper", deep_helper)
+    engine = LazySMPEngine(V0Evaluator(), processes=2, size_bits=12)
+    try:
+        play_result = engine.play(ExtendedBoard(MATE_IN_ONE_FEN), Limit(depth=2))
+    finally:
+        engine.quit()
+    # Ponder move and info come from the helper line
+    assert (play_result.move, play_result.ponder) == (Move.from_uci("b7b8"), Move.from_uci("g3g8"))
+    assert play_result.info["depth"] == 10
+    assert play_result.info["score"].white().score() == 150
+    assert play_result.info["nodes"] >= 100
@@ -0,0 +1,42 @@
+import time
+
+from chess.engine import Limit
+
+from engine.basilisk import BasiliskEngine
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator
+
+FEN = "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3"
+
+
+def play_and_reply(use_ponder_move: bool) -> tuple[int, bool]:
+    """(number of new searches, whether the answer came in time) after a reply which is or isn't the ponder move"""
+    engine = BasiliskEngine(V0Evaluator(), ponder=True)
+    searches = []
+    search = engine.search
+    engine.search = lambda *args: searches.append(args) or search(*args)
+
+    board = ExtendedBoard(FEN)
+    play_result = engine.play(board, Limit(time=0.3))
+    assert play_result.ponder is not None
+    assert engine.ponder_thread is not None
+
+    board.push(play_result.move)
+    reply = play_result.ponder if use_ponder_move else next(move for move in board.legal_moves if move != play_result.ponder)
+    board.push(reply)
+    time.sleep(0.1)
+    start = time.time()
+    play_result = engine.play(ExtendedBoard(board.fen()), Limit(time=0.3))
+    elapsed = time.time() - start
+    assert play_result.move in board.legal_moves
+    engine.quit()
+    return len(searches) - 1, elapsed < 2
+
+
+def test_ponder_hit():
+    # Pondering search goes on with the normal time limit
+    assert play_and_reply(use_ponder_move=True) == (0, True)
+
+
+def test_ponder_miss():
+    assert play_and_reply(use_ponder_move=False) == (1, True)
@@ -0,0 +1,22 @@
+import time
+
+from chess import Board
+
+from engine.base import RandomEngine
+from engine.evaluators import BasicMaterialEvaluator
+from rungame import Game
+
+
+class SlowRandomEngine(RandomEngine):
+    def play(self, board: Board, *args, **kwargs):
+        time.sleep(0.05)
+        return super().play(board)
+
+
+def test_game_time_forfeit():
+    game_result = Game(RandomEngine(BasicMaterialEvaluator()), SlowRandomEngine(BasicMaterialEvaluator())).play(clock=(0.08, 0))
+    # Black runs out of the clock on its second move
+    assert game_result.result == 1
+    assert game_result.fullmove_number == 2
+    assert '[Termination "time forfeit"]' in game_result.pgn
+    assert '[Result "1-0"]' in game_result.pgn
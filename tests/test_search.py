@@ -0,0 +1,129 @@
+import math
+
+from chess import Move, STARTING_FEN
+from chess.engine import Limit, Mate
+
+from engine import basilisk
+from engine.basilisk import BasiliskEngine
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator
+from engine.time_manager import TimeManager
+
+
+def search(fen: str, depth: int, engine: BasiliskEngine | None = None):
+    engine = engine or BasiliskEngine(V0Evaluator(noise=False))
+    return engine.play(ExtendedBoard(fen), Limit(depth=depth))
+
+
+def test_minor_piece_mate():
+    # Only minor pieces are left, the mate must not be taken for a draw by insufficient material
+    play_result = search("7k/8/6KN/8/5B2/8/8/8 w - - 0 1", 3)
+    assert play_result.move == Move.from_uci("f4e5")
+    assert play_result.info["score"].white() == Mate(1)
+
+
+def test_null_move_zugzwang(monkeypatch):
+    # Only pawns left and the defender in zugzwang, a null move cutoff here would hide the win
+    # unless it is skipped or verified, the result must match a search without null moves
+    fen = "1k6/8/1PK5/8/8/8/8/8 w - - 0 1"
+    play_result = search(fen, 6)
+    monkeypatch.setattr(basilisk, "NULL_MOVE_MIN_DEPTH", 100)
+    reference = search(fen, 6)
+    assert play_result.move == reference.move == Move.from_uci("b6b7")
+    assert play_result.info["score"] == reference.info["score"]
+
+
+def test_null_move_verification():
+    # Cutoff after passing is confirmed by a normal search at verification depth
+    engine = BasiliskEngine(V0Evaluator(noise=False))
+    engine.board = ExtendedBoard("4k3/8/8/8/8/8/8/3QK3 w - - 0 1")
+    engine.time_manager = TimeManager(engine.board, Limit())
+    verifications = []
+    find_move = engine.find_move
+
+    def spy(max_depth, master_alpha, master_beta, is_top_level=False, can_null_move=True):
+        if not engine.board.move_stack:
+            verifications.append((max_depth, can_null_move))
+        return find_move(max_depth, master_alpha, master_beta, is_top_level, can_null_move)
+
+    engine.find_move = spy
+    assert engine.null_move_search(basilisk.NULL_MOVE_VERIFICATION_DEPTH, -math.inf, 0) >= 0
+    assert verifications == [(basilisk.NULL_MOVE_VERIFICATION_DEPTH - basilisk.NULL_MOVE_REDUCTION, False)]
+
+    verifications.clear()
+    assert engine.null_move_search(basilisk.NULL_MOVE_VERIFICATION_DEPTH - 1, -math.inf, 0) >= 0
+    assert verifications == []
+
+
+def test_late_move_reduction_research():
+    # Late quiet moves failing high on the reduced search are searched again at full depth
+    engine = BasiliskEngine(V0Evaluator(noise=False))
+    engine.board = ExtendedBoard(STARTING_FEN)
+    engine.time_manager = TimeManager(engine.board, Limit())
+    searches = []
+    null_window_search = engine.null_window_search
+
+    def fake(depth, alpha, beta, is_white):
+        if len(engine.board.move_stack) != 1:
+            return null_window_search(depth, alpha, beta, is_white)
+        searches.append((engine.board.move_stack[-1], depth))
+        # Reduced search fails high, full depth one fails low
+        return alpha + 1 if depth == 1 else alpha - 1
+
+    engine.null_window_search = fake
+    # Bound out of reach, no move causes a cutoff and all of them are searched
+    engine.find_move(3, 5, 5 + basilisk.NULL_WINDOW, can_null_move=False)
+    reduced = [i for i, (_, depth) in enumerate(searches) if depth == 1]
+    assert reduced
+    for i in reduced:
+        assert searches[i + 1:i + 2] == [(searches[i][0], 2)]
+
+
+def search_with_windows(fen: str, depth: int) -> tuple:
+    """(play result, [(zobrist hash, max depth, alpha, beta)] of the searches of root moves)"""
+    engine = BasiliskEngine(V0Evaluator(noise=False))
+    windows = []
+    find_move = engine.find_move
+
+    def spy(max_depth, master_alpha, master_beta, is_top_level=False, can_null_move=True):
+        if len(engine.board.move_stack) == 1:
+            windows.append((engine.board.zobrist_hash, max_depth, master_alpha, master_beta))
+        return find_move(max_depth, master_alpha, master_beta, is_top_level, can_null_move)
+
+    engine.find_move = spy
+    return engine.play(ExtendedBoard(fen), Limit(depth=depth)), windows
+
+
+def test_aspiration_research(monkeypatch):
+    # Window this narrow fails on the score of the previous iteration, the root must widen it and search again
+    monkeypatch.setattr(basilisk, "ASPIRATION_WINDOW", 0.01)
+    play_result, windows = search_with_windows(STARTING_FEN, 3)
+    first_move_hash = next(key for key, max_depth, _, _ in windows if max_depth == 2)
+    first_move_windows = [(alpha, beta) for key, max_depth, alpha, beta in windows if key == first_move_hash and max_depth == 2]
+    assert len(first_move_windows) > 1
+    for (alpha, beta), (wider_alpha, wider_beta) in zip(first_move_windows, first_move_windows[1:]):
+        assert wider_alpha <= alpha and beta <= wider_beta and wider_beta - wider_alpha > beta - alpha
+
+    monkeypatch.setattr(basilisk, "ASPIRATION_WINDOW", math.inf)
+    reference, _ = search_with_windows(STARTING_FEN, 3)
+    assert play_result.move == reference.move
+    assert play_result.info["score"] == reference.info["score"]
+
+
+def test_principal_variation_research():
+    # Move beating the best one in the null window search is searched again with the full window
+    _, windows = search_with_windows(STARTING_FEN, 3)
+    assert any(
+        key == next_key and max_depth == next_max_depth
+        and math.isclose(beta - alpha, basilisk.NULL_WINDOW) and next_beta - next_alpha > basilisk.NULL_WINDOW
+        for (key, max_depth, alpha, beta), (next_key, next_max_depth, next_alpha, next_beta) in zip(windows, windows[1:])
+    )
+
+
+def test_quiescence(monkeypatch):
+    # At depth 2 Nxe5 Nxe5 ends the line, only quiescence sees Rxe5 winning the knight back
+    fen = "6k1/ppp2ppp/2n5/4p3/8/5N2/PPP2PPP/4R1K1 w - - 0 1"
+    assert search(fen, 2).move == Move.from_uci("f3e5")
+
+    monkeypatch.setattr(BasiliskEngine, "quiescence", lambda engine, alpha, beta: engine.evaluator.evaluate(engine.board))
+    assert search(fen, 2).move != Move.from_uci("f3e5")
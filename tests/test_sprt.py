@@ -0,0 +1,10 @@
+from engine.sprt import sprt, H0, H1
+
+
+def test_sprt():
+    assert sprt(0, 0, 0) == (None, 0.)
+    assert sprt(5, 10, 5)[0] is None
+    assert sprt(300, 400, 100)[0] == H1
+    assert sprt(100, 400, 300)[0] == H0
+    # More games with the same score give stronger evidence
+    assert sprt(60, 100, 40)[1] < sprt(120, 200, 80)[1]
@@ -0,0 +1,24 @@
+import json
+
+from chess.engine import Limit
+
+from engine.basilisk import BasiliskEngine
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator
+from engine.stats import StatsCollector, aggregate
+
+
+def test_stats_collector(tmp_path):
+    path = str(tmp_path / "stats.jsonl")
+    engine = BasiliskEngine(V0Evaluator(), stats_collector=StatsCollector(path))
+    for fen in ["r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", "8/8/2K5/pP6/8/8/8/7k w - a6 0 2"]:
+        engine.play(ExtendedBoard(fen), Limit(depth=3))
+
+    with open(path) as file:
+        records = [json.loads(line) for line in file]
+    assert len(records) == 2
+    assert records[0]["depths"] == [2, 3]
+    assert records[0]["nodes"] == sum(records[0]["nodes_per_depth"])
+    assert 0 < records[0]["first_move_cutoffs"] <= records[0]["beta_cutoffs"]
+    assert records[0]["evaluations"] > 0
+    assert aggregate(path)["searches"] == 2
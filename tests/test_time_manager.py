@@ -0,0 +1,38 @@
+import pytest
+from chess import Board
+from chess.engine import Limit
+
+from engine.time_manager import TimeManager
+
+BLACK_TO_MOVE = Board("rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1")
+
+
+@pytest.mark.parametrize("board, limit, expected", [
+    # Fixed time per move is used whole, less the safety margin
+    (Board(), Limit(time=1), (0.99, 0.99)),
+    (Board(), Limit(), (None, None)),
+    (Board(), Limit(depth=5), (None, None)),
+    # Clock split over 30 moves plus most of the increment, hard limit at 4 times that
+    (Board(), Limit(white_clock=60, black_clock=10, white_inc=1, black_inc=0), (2.75, 10.99)),
+    (BLACK_TO_MOVE, Limit(white_clock=60, black_clock=10, white_inc=1, black_inc=0), (1 / 3, 4 / 3 - 0.01)),
+    # Few moves to go, soft limit is clamped by the hard limit at a quarter of the clock
+    (Board(), Limit(white_clock=10, remaining_moves=2), (2.49, 2.49)),
+    # Almost empty clock
+    (Board(), Limit(white_clock=0.005), (0, 0)),
+])
+def test_allocate(board, limit, expected):
+    assert TimeManager.allocate(board, limit) == pytest.approx(expected)
+
+
+def test_limits():
+    time_manager = TimeManager(Board(), Limit(white_clock=60, white_inc=1))
+    assert time_manager.can_start_iteration() and not time_manager.is_time_up()
+    time_manager.start_time -= 5
+    # After the soft limit no new iteration starts, the running one goes on until the hard limit
+    assert not time_manager.can_start_iteration() and not time_manager.is_time_up()
+    time_manager.start_time -= 10
+    assert time_manager.is_time_up()
+
+    time_manager = TimeManager(Board(), Limit())
+    time_manager.start_time -= 1000
+    assert time_manager.can_start_iteration() and not time_manager.is_time_up()
@@ -0,0 +1,40 @@
+import pytest
+from chess import Move
+from chess.engine import Limit, Mate
+
+from engine.basilisk import BasiliskEngine, score_to_table, score_from_table
+from engine.board import ExtendedBoard
+from engine.evaluators import V0Evaluator, MATE_EVALUATION
+from engine.transposition import TranspositionTable, SharedTranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+
+
+@pytest.mark.parametrize("table_class", [TranspositionTable, SharedTranspositionTable])
+def test_store_and_probe(table_class):
+    table = table_class(size_bits=4)
+    try:
+        table.store(0x1234_5678_9abc_def0, 3, EXACT, -1.25, Move.from_uci("e7e8q"))
+        table.store(0x0fed_cba9_8765_4321, 5, LOWER_BOUND, 1012., None)
+
+        assert table.probe(0x1234_5678_9abc_def0) == (0x1234_5678_9abc_def0, 3, EXACT, -1.25, Move.from_uci("e7e8q"))
+        assert table.probe(0x0fed_cba9_8765_4321) == (0x0fed_cba9_8765_4321, 5, LOWER_BOUND, 1012., None)
+        assert table.probe(0x1234_5678_9abc_def1) is None
+
+        # Shallower result of the same position doesn't replace the deeper one
+        table.store(0x0fed_cba9_8765_4321, 2, UPPER_BOUND, 0.5, None)
+        assert table.probe(0x0fed_cba9_8765_4321)[1] == 5
+    finally:
+        if table_class is SharedTranspositionTable:
+            table.close()
+
+
+def test_mate_score_in_table():
+    # Mate with 5 plies left at the mated position, found at a node with 7 plies left, is 2 plies away
+    assert score_to_table(MATE_EVALUATION + 5, 7) == MATE_EVALUATION - 2
+    assert score_from_table(score_to_table(-MATE_EVALUATION - 5, 7), 3) == -MATE_EVALUATION - 1
+    assert score_from_table(score_to_table(1.5, 7), 3) == 1.5
+
+    engine = BasiliskEngine(V0Evaluator())
+    # Mate in 1 stored from a deeper search than where the position is reached in the next one
+    assert engine.play(ExtendedBoard("4r1k1/5ppp/8/8/8/8/8/4R1K1 w - - 0 2"), Limit(depth=3)).info["score"].white() == Mate(1)
+    play_result = engine.play(ExtendedBoard("3r2k1/5ppp/8/8/8/8/4R3/4R1K1 w - - 0 1"), Limit(depth=4))
+    assert play_result.info["score"].white() == Mate(2)
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from engine.dataset import RECORD_DTYPE, pack_board
+from engine.evaluators import V0Evaluator
+from engine.tuner import TexelTuner, INITIAL_PARAMETERS, extract_features, has_cutoff
+
+
+def test_evaluate(random_boards):
+    boards = random_boards(100)
+    records = np.array([pack_board(board, 0, 0.5) for board in boards], dtype=RECORD_DTYPE)
+    tuner = TexelTuner([records])
+    evaluations, _ = tuner.evaluate(INITIAL_PARAMETERS)
+
+    evaluator = V0Evaluator(noise=False)
+    white, black = extract_features(records)
+    parameters = np.append(INITIAL_PARAMETERS, 1)
+    keep = ~has_cutoff(white @ parameters, black @ parameters)
+    expected = evaluator.evaluate_many(boards) - [evaluator._evaluate_checks(board) for board in boards]
+    assert len(evaluations) == keep.sum() > 0
+    for evaluation, expected_evaluation, difference in zip(evaluations, expected[keep], (white - black)[keep] @ parameters):
+        # Float32 features may fall on the other side of the simplification threshold
+        if abs(abs(difference) - 1.95) > 1e-3:
+            assert evaluation == pytest.approx(expected_evaluation, abs=1e-3)
+
+
+def test_tune(random_boards):
+    boards = random_boards(200)
+    evaluations = V0Evaluator(noise=False).evaluate_many(boards)
+    # Results follow the evaluation, the fitted scale must be positive and tuning must not make the loss worse
+    records = np.array([pack_board(board, 0, 1 if evaluation > 0 else 0) for board, evaluation in zip(boards, evaluations)], dtype=RECORD_DTYPE)
+    tuner = TexelTuner([records])
+    scale = tuner.fit_scale()
+    assert scale > 0.01
+    initial_loss = tuner.loss(tuner.parameters, scale, tuner.targets)
+    parameters = tuner.tune(epochs=50)
+    assert tuner.loss(parameters, scale, tuner.targets) < initial_loss
@@ -0,0 +1,28 @@
+import io
+
+from engine.basilisk import BasiliskEngine
+from engine.evaluators import V0Evaluator
+from engine.uci import UciFrontend, parse_go
+
+
+def test_uci_session():
+    output = io.StringIO()
+    frontend = UciFrontend(BasiliskEngine(V0Evaluator()), io.StringIO("uci\nisready\n"), output)
+    frontend.run()
+
+    frontend.handle("position fen 4k3/1R4p1/3KP2p/p7/8/6r1/PP6/8 w - - 1 2")
+    frontend.handle("go depth 3")
+    frontend.search_thread.join()
+
+    lines = output.getvalue().splitlines()
+    assert lines[:4] == ["id name Basilisk", "id author Jakub Sztyma", "uciok", "readyok"]
+    assert any(line.startswith("info depth 3 score mate 1") for line in lines)
+    assert lines[-1] == "bestmove b7b8"
+
+
+def test_parse_go():
+    limit, infinite, ponder = parse_go("searchmoves e2e4 d2d4 wtime 1000 btime -50 winc x movestogo 5 foo".split())
+    assert (limit.white_clock, limit.black_clock, limit.white_inc, limit.remaining_moves) == (1., -0.05, None, 5)
+    assert (infinite, ponder) == (False, False)
+    limit, infinite, ponder = parse_go("ponder depth 4 searchmoves e2e4 infinite".split())
+    assert (limit.depth, infinite, ponder) == (4, True, True)
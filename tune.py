@@ -0,0 +1,44 @@
+"""
+Texel tuning of V0Evaluator over position records from selfplay.py: python tune.py data --epochs 1000
+Tuned values are written as JSON and printed as the constants of engine/piece_square_tables.py.
+"""
+import argparse
+import json
+import os
+import time
+
+from engine.dataset import load_dataset, list_shards
+from engine.tuner import TexelTuner, PARAMETER_NAMES, format_parameters
+
+LOG_INTERVAL = 100  # Epochs
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Texel tuning of V0Evaluator coefficients")
+    parser.add_argument("datasets", nargs="+", help="record files or directories of shards")
+    parser.add_argument("--epochs", type=int, default=1000)
+    parser.add_argument("--learning-rate", type=float, default=0.002)
+    parser.add_argument("--score-weight", type=float, default=0., help="part of the target taken from the search score, 0 is game results only")
+    parser.add_argument("--output", default="coefficients.json")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    paths = [shard for path in args.datasets for shard in (list_shards(path) if os.path.isdir(path) else [path])]
+    datasets = [load_dataset(path) for path in paths]
+    tuner = TexelTuner(datasets, args.score_weight)
+    print(f"Positions: {len(tuner)} of {sum(len(records) for records in datasets)}, features in {time.perf_counter() - start:.1f} s")
+
+    scale = tuner.fit_scale()
+    initial_loss = tuner.loss(tuner.parameters, scale, tuner.targets)
+    print(f"Sigmoid scale: {scale:.4f}, initial loss: {initial_loss:.6f}")
+
+    def log(epoch: int, loss: float):
+        if epoch % LOG_INTERVAL == 0:
+            print(f"Epoch {epoch}, loss: {loss:.6f}, time {time.perf_counter() - start:.1f} s")
+
+    parameters = tuner.tune(args.epochs, args.learning_rate, log)
+    final_loss = tuner.loss(parameters, scale, tuner.targets)
+    print(f"Loss: {initial_loss:.6f} -> {final_loss:.6f}")
+
+    with open(args.output, "w") as file:
+        json.dump({"scale": scale, "loss": final_loss, **dict(zip(PARAMETER_NAMES, parameters.tolist()))}, file, indent=2)
+    print(format_parameters(parameters))
@@ -0,0 +1,9 @@
+"""
+UCI entry point, eg. for cutechess-cli or a chess GUI: python uci.py
+"""
+from engine.basilisk import BasiliskEngine
+from engine.evaluators import V0Evaluator, CachedEvaluator
+from engine.uci import UciFrontend
+
+if __name__ == '__main__':
+    UciFrontend(BasiliskEngine(CachedEvaluator(V0Evaluator()))).run()